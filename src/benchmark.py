@@ -0,0 +1,775 @@
+"""
+Performance benchmarks for the Job Tracker Agent.
+
+Usage:
+  python src/benchmark.py extraction <portal> <url-or-html-file> [--repeat N]
+  python src/benchmark.py store [--rows 1000 5000 10000] [--new-jobs 20]
+  python src/benchmark.py classify [--emails 10000] [--keyword-scale 1 10]
+  python src/benchmark.py match [--responses 200] [--applied 100 500] [--skip-legacy]
+  python src/benchmark.py signature [--emails 5] [--quote-depth 10 50]
+  python src/benchmark.py idle [--messages 20] [--drop-every 5]
+  python src/benchmark.py suite [--emails 1000] [--mbox FILE] [--html-dir DIR] [--pages 3]
+                                [--rows 1000 10000 100000] [--latency 0] [--output report.json]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@contextmanager
+def count_round_trips(driver):
+    """Count WebDriver commands (each one is an HTTP round trip) issued inside the block"""
+    counter = {'calls': 0}
+    original_execute = driver.execute
+
+    def counting_execute(*args, **kwargs):
+        counter['calls'] += 1
+        return original_execute(*args, **kwargs)
+
+    # WebElement commands are routed through their parent driver's execute
+    driver.execute = counting_execute
+    try:
+        yield counter
+    finally:
+        del driver.execute
+
+
+def bench_extraction(args):
+    """Compare per-element and single-script job card extraction on one page"""
+    from src.job_tracker import JobTrackingAgent
+
+    url = args.url
+    if os.path.exists(url):
+        url = Path(url).resolve().as_uri()
+
+    agent = JobTrackingAgent()
+    limit = agent.config.get('max_jobs_per_run', 20)
+    try:
+        with agent.driver_pool.acquire() as driver:
+            agent.load_search_page(driver, args.portal, url)
+
+            print(f"Job card extraction on {url} ({args.repeat} runs each)")
+            for mode in ('elements', 'script'):
+                timings = []
+                with count_round_trips(driver) as counter:
+                    for _ in range(args.repeat):
+                        started = time.perf_counter()
+                        total, cards = agent.extract_job_cards(driver, args.portal, limit, mode)
+                        timings.append(time.perf_counter() - started)
+
+                print(
+                    f"  {mode:<9} cards={len(cards):<3} "
+                    f"round trips/page={counter['calls'] / args.repeat:.0f} "
+                    f"median={statistics.median(timings) * 1000:.1f}ms "
+                    f"max={max(timings) * 1000:.1f}ms"
+                )
+    finally:
+        agent.cleanup()
+
+
+COMPANY_WORDS = (
+    ['Acme', 'Nova', 'Blue', 'Bright', 'Quant', 'Cloud', 'Apex', 'Green', 'Swift', 'Iron'],
+    ['works', 'labs', 'soft', 'logic', 'scale', 'forge', 'path', 'byte', 'stack', 'wave'],
+    ['', ' Systems', ' Analytics', ' Health', ' Finance', ' Media', ' Robotics', ' Energy', ' Retail', ' Games']
+)
+
+
+def company_name(number):
+    """Distinct, realistic company name for a number below 1000"""
+    first, second, third = COMPANY_WORDS
+    name = first[number % 10] + second[number // 10 % 10] + third[number // 100 % 10]
+    return name + ('' if number < 1000 else f" {number // 1000}")
+
+
+def synthetic_rows(count, seed=0):
+    """Workbook-shaped rows with a realistic mix of statuses"""
+    rng = random.Random(seed)
+    titles = ['Python Developer', 'Software Engineer', 'Data Scientist', 'Backend Developer', 'Web Developer']
+    statuses = ['Found'] * 8 + ['Applied', 'Rejected']
+    rows = []
+    for i in range(count):
+        status = rng.choice(statuses)
+        rows.append({
+            'Date_Found': f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'Title': f"{rng.choice(titles)} {i}",
+            'Company': company_name(rng.randint(0, count // 3 + 1)),
+            'Location': 'Remote',
+            'Website_Link': f"https://example.com/jobs/{i}",
+            'Portal': rng.choice(['Indeed', 'LinkedIn']),
+            'Status': status,
+            'Date_Applied': '2026-10-01' if status != 'Found' else '',
+            'Recruiter_Response': '',
+            'Response_Date': '',
+            'Notes': ''
+        })
+    return rows
+
+
+def bench_store(args):
+    """Per-run cost of the old full-workbook rewrite vs. the SQLite job store"""
+    import pandas as pd
+    from src.job_store import JobStore
+
+    print(f"Adding {args.new_jobs} new jobs per run")
+    print(f"  {'rows':>7}  {'excel rewrite':>14}  {'store update':>13}  {'export':>8}  {'one-time import':>16}")
+    for count in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            excel_file = os.path.join(tmp, 'jobs.xlsx')
+            pd.DataFrame(synthetic_rows(count)).to_excel(excel_file, index=False)
+            new_rows = synthetic_rows(args.new_jobs, seed=1)
+            for row in new_rows:
+                row['Title'] += ' (new)'
+                row['Website_Link'] += '-new'
+
+            # Previous path: read the whole workbook, dedup with a scan per job, rewrite it
+            started = time.perf_counter()
+            df = pd.read_excel(excel_file)
+            fresh = []
+            for row in new_rows:
+                existing = df[
+                    (df['Title'].str.lower() == row['Title'].lower()) &
+                    (df['Company'].str.lower() == row['Company'].lower())
+                ]
+                if existing.empty:
+                    fresh.append(row)
+            pd.concat([df, pd.DataFrame(fresh)], ignore_index=True).to_excel(excel_file, index=False)
+            excel_time = time.perf_counter() - started
+
+            store = JobStore(os.path.join(tmp, 'jobs.db'))
+            started = time.perf_counter()
+            store.import_excel(excel_file)
+            import_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            store.add_new_jobs(new_rows)
+            store.get_jobs_by_status('Applied')
+            store_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            store.export_excel(excel_file, force=True)
+            export_time = time.perf_counter() - started
+            store.close()
+
+        print(f"  {count:>7}  {excel_time:>13.2f}s  {store_time:>12.3f}s  {export_time:>7.2f}s  {import_time:>15.2f}s")
+
+
+def synthetic_emails(count, seed=0):
+    """(subject, content, sender) triples resembling a mixed inbox"""
+    from src.keyword_matcher import DEFAULT_EMAIL_KEYWORDS
+
+    rng = random.Random(seed)
+    filler = (
+        "thanks for your message we wanted to follow up on the project update "
+        "please find the attached notes and let us know what you think about it"
+    ).split()
+    keywords = [keyword for keywords in DEFAULT_EMAIL_KEYWORDS.values() for keyword in keywords]
+    senders = ['jane@acme.com', 'noreply@jobs.example.com', 'deals@shop.example.com', 'friend@gmail.com']
+
+    emails = []
+    for _ in range(count):
+        words = [rng.choice(filler) for _ in range(rng.randint(80, 400))]
+        for _ in range(rng.randint(0, 4)):
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        subject = ' '.join(rng.choice(filler + keywords) for _ in range(6))
+        emails.append((subject, ' '.join(words), rng.choice(senders)))
+    return emails
+
+
+def legacy_classify(subject, content, sender, keyword_sets):
+    """is_job_related + categorize_response as implemented before KeywordMatcher"""
+    text_to_check = (subject + ' ' + content + ' ' + sender).lower()
+    keyword_count = sum(keyword in text_to_check for keyword in keyword_sets['job'])
+    if any(indicator in text_to_check for indicator in keyword_sets['spam']):
+        related = keyword_count >= 3
+    elif any(auto in sender.lower() for auto in keyword_sets['automated_sender']):
+        related = keyword_count >= 2
+    else:
+        related = keyword_count >= 1
+
+    content_lower = content.lower()
+    for category, label in (('auto_reply', 'Auto-Reply'), ('rejection', 'Rejection'),
+                            ('interview', 'Interview Request'), ('interest', 'Interested')):
+        if any(keyword in content_lower for keyword in keyword_sets[category]):
+            return related, label
+    return related, 'Other'
+
+
+def bench_classify(args):
+    """Keyword classification cost: per-keyword scans vs. the single-pass matcher"""
+    import json
+    from src.email_tracker import EmailResponseTracker
+    from src.job_store import JobStore
+    from src.keyword_matcher import DEFAULT_EMAIL_KEYWORDS
+
+    emails = synthetic_emails(args.emails)
+    chars = sum(len(subject) + len(content) for subject, content, _ in emails)
+    print(f"Classifying {len(emails)} synthetic emails ({chars / len(emails):.0f} chars on average)")
+
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'job_config.json')) as f:
+        config = json.load(f)
+
+    for scale in args.keyword_scale:
+        # Scale up every keyword set with extra (non-matching) keywords
+        keyword_sets = {
+            name: list(keywords) + [f"{keyword} extra{i}" for i in range(1, scale) for keyword in keywords]
+            for name, keywords in DEFAULT_EMAIL_KEYWORDS.items()
+        }
+        total_keywords = sum(len(keywords) for keywords in keyword_sets.values())
+
+        started = time.perf_counter()
+        legacy = [legacy_classify(subject, content, sender, keyword_sets) for subject, content, sender in emails]
+        legacy_time = time.perf_counter() - started
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tracker = EmailResponseTracker(dict(config, email_keywords=keyword_sets), JobStore(os.path.join(tmp, 'jobs.db')))
+            started = time.perf_counter()
+            matched = [
+                (tracker.is_job_related(subject, content, sender), tracker.categorize_response(subject, content))
+                for subject, content, sender in emails
+            ]
+            matcher_time = time.perf_counter() - started
+            tracker.store.close()
+
+        agree = sum(a == b for a, b in zip(legacy, matched))
+        print(
+            f"  {total_keywords:>5} keywords: per-keyword scans {legacy_time:.2f}s "
+            f"({len(emails) / legacy_time:,.0f} emails/s), matcher {matcher_time:.2f}s "
+            f"({len(emails) / matcher_time:,.0f} emails/s), identical results {agree}/{len(emails)}"
+        )
+
+
+def legacy_best_match(response, applied_jobs):
+    """Per-pair scoring loop of match_responses_to_applications before ApplicationMatcher"""
+    import pandas as pd
+    from datetime import datetime
+
+    best_match = None
+    best_score = 0
+    for idx, job in applied_jobs.iterrows():
+        score = 0
+        company_name = str(job['Company']).lower()
+        response_company = response['company'].lower()
+        if company_name in response_company or response_company in company_name:
+            score += 5
+        if '@' in response['sender']:
+            domain = response['sender'].split('@')[1].lower()
+            company_clean = company_name.replace(' ', '').replace('-', '')
+            if company_clean in domain.replace('-', '').replace('.', ''):
+                score += 3
+        subject_lower = response['subject'].lower()
+        for word in str(job['Title']).lower().split():
+            if len(word) > 3 and word in subject_lower:
+                score += 1
+        if pd.notna(job['Date_Applied']):
+            try:
+                days_since_applied = (datetime.now() - pd.to_datetime(job['Date_Applied'])).days
+                if days_since_applied <= 7:
+                    score += 2
+                elif days_since_applied <= 14:
+                    score += 1
+            except Exception:
+                pass
+        if score > best_score:
+            best_score = score
+            best_match = idx
+    return best_match if best_score >= 3 else None
+
+
+def synthetic_responses(count, rows, seed=0):
+    """Response dicts as built by check_for_responses, some naming a tracked company"""
+    rng = random.Random(seed)
+    responses = []
+    for i in range(count):
+        row = rng.choice(rows)
+        known = rng.random() < 0.6
+        company = row['Company'] if known else f"Other Corp {i}"
+        domain = company.lower().replace(' ', '') + '.com' if rng.random() < 0.5 else 'mail.example.com'
+        responses.append({
+            'sender': f"Recruiting <jobs@{domain}>",
+            'subject': f"Your application: {row['Title'] if known else 'Account Manager'}",
+            'content': '',
+            'company': company if rng.random() < 0.7 else '',
+            'response_type': 'Other'
+        })
+    return responses
+
+
+def bench_match(args):
+    """Response-to-application matching: per-pair loop, full score matrix and token-indexed candidates"""
+    from datetime import datetime, timedelta
+    import pandas as pd
+    from src.job_store import JobStore
+    from src.response_matcher import ApplicationMatcher, response_tokens
+
+    print(f"Matching {args.responses} responses")
+    for count in args.applied:
+        rows = synthetic_rows(count)
+        rng = random.Random(2)
+        for row in rows:
+            row['Status'] = 'Applied'
+            row['Date_Applied'] = (datetime.now() - timedelta(days=rng.randint(0, 30))).strftime('%Y-%m-%d')
+        applied_jobs = pd.DataFrame(rows, index=range(1, count + 1))
+        responses = synthetic_responses(args.responses, rows)
+
+        legacy_time = None
+        if not args.skip_legacy:
+            started = time.perf_counter()
+            legacy = [legacy_best_match(response, applied_jobs) for response in responses]
+            legacy_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        matched = ApplicationMatcher(applied_jobs).best_matches(responses)
+        matrix_time = time.perf_counter() - started
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = JobStore(os.path.join(tmp, 'jobs.db'))
+            store.add_new_jobs(rows)
+            started = time.perf_counter()
+            tokens = [response_tokens(response) for response in responses]
+            postings = store.find_applications(set().union(*tokens), 50)
+            candidates = [set().union(*(postings.get(token, ()) for token in response)) for response in tokens]
+            indexed = ApplicationMatcher(store.get_jobs(set().union(*candidates))).best_matches(responses, candidates)
+            indexed_time = time.perf_counter() - started
+            store.close()
+
+        line = f"  {count:>6} applied jobs:"
+        if legacy_time is not None:
+            agree = sum(a == b for a, b in zip(legacy, matched))
+            line += f" per-pair loop {legacy_time:.2f}s,"
+        line += f" score matrix {matrix_time:.3f}s"
+        if legacy_time is not None:
+            line += f" (identical {agree}/{len(responses)})"
+        same = sum(a == b for a, b in zip(matched, indexed))
+        # With no extracted company, every job gets the +5 company points in the full matrix
+        no_company = sum(a != b and not response['company'] for a, b, response in zip(matched, indexed, responses))
+        line += (
+            f", indexed {indexed_time:.3f}s with {sum(map(len, candidates)) / len(responses):.1f} "
+            f"candidates/response (same match as full matrix {same}/{len(responses)}, "
+            f"{no_company} of the rest without an extracted company)"
+        )
+        print(line)
+
+
+def legacy_extract_company(email_content, sender):
+    """extract_company_from_email as implemented before the patterns were precompiled and bounded"""
+    import re
+
+    if '@' in sender:
+        company_domain = sender.split('@')[1].lower().split('.')[0]
+        if company_domain not in ['gmail', 'yahoo', 'outlook', 'hotmail', 'aol', 'icloud']:
+            return company_domain.replace('-', ' ').title()
+
+    signature_patterns = [
+        r'Best regards,\s*\n.*?\n(.*?)(?:\n|$)',
+        r'Sincerely,\s*\n.*?\n(.*?)(?:\n|$)',
+        r'Thanks,\s*\n.*?\n(.*?)(?:\n|$)',
+        r'(\w+\s+\w+)\s*\|\s*(.+?)(?:\n|$)',
+        r'From:\s*(.+?)(?:\n|$)'
+    ]
+    for pattern in signature_patterns:
+        for match in re.findall(pattern, email_content, re.IGNORECASE | re.MULTILINE):
+            if isinstance(match, tuple):
+                company = match[1] if len(match) > 1 else match[0]
+            else:
+                company = match
+            company = company.strip()
+            if len(company.split()) <= 3 and len(company) > 2:
+                return company
+    return "Unknown Company"
+
+
+def quoted_reply(depth, seed=0):
+    """A reply on top of a long quoted thread, built to make signature scanning slow
+
+    Every quoted level repeats the closing phrases, long lines of words and a
+    long unbroken token (a tracking link), so the patterns keep finding
+    almost-matches all the way down; the reply's own signature only matches
+    the last-but-one pattern.
+    """
+    rng = random.Random(seed)
+    words = "please see the notes below and let me know what you think about the plan".split()
+    reply = "Hi,\n\nI am available on Tuesday.\n\nJane Doe | Acme Robotics\n\n"
+    levels = []
+    for level in range(1, depth + 1):
+        prefix = '> ' * level
+        body = ' '.join(rng.choice(words) for _ in range(300))
+        token = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(2000))
+        levels.append(
+            f"On Mon, 5 Oct 2026 at 10:{level % 60:02d}, Person {level} <p{level}@example.com> wrote:\n"
+            f"{prefix}{body}\n{prefix}https://click.example.com/{token}\n{prefix}Best regards,{chr(10) * 20}"
+        )
+    return reply + '\n'.join(levels)
+
+
+def bench_signature(args):
+    """Company extraction from signatures on long quoted reply threads"""
+    import json
+    from src.email_tracker import EmailResponseTracker
+
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'job_config.json')) as f:
+        config = json.load(f)
+    tracker = EmailResponseTracker.for_parsing(config)
+    senders = [f"person{number}@gmail.com" for number in range(50)]
+
+    print(f"Extracting the company from {args.emails} replies sent from free-mail addresses")
+    for depth in args.quote_depth:
+        emails = [(quoted_reply(depth, seed), senders[seed % len(senders)]) for seed in range(args.emails)]
+        size = sum(len(content) for content, _ in emails) / len(emails)
+
+        results = {}
+        for name, extract in (('legacy', legacy_extract_company), ('bounded', tracker.extract_company_from_email)):
+            timings = []
+            companies = []
+            for content, sender in emails:
+                started = time.perf_counter()
+                companies.append(extract(content, sender))
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            results[name] = companies
+            print(
+                f"  depth {depth:>4} ({size / 1024:,.0f} KB/email) {name:<8} total {sum(timings):.3f}s, "
+                f"p50 {statistics.median(timings) * 1000:.3f}ms, max {timings[-1] * 1000:.3f}ms"
+            )
+        print(f"    companies found: legacy {results['legacy'][0]!r}, bounded {results['bounded'][0]!r}")
+
+
+def interview_invite(company, number) -> bytes:
+    """Raw recruiter email inviting to an interview, sent now"""
+    from datetime import datetime
+    from email.mime.text import MIMEText
+    from email.utils import format_datetime
+
+    domain = company.lower().replace(' ', '-') + '.com'
+    message = MIMEText(
+        "Hello,\n\nWe would like to schedule an interview for the Python Developer position. "
+        f"Are you available next week?\n\nBest regards,\nJordan Smith\n{company}\n"
+    )
+    message['From'] = f"{company} Recruiting <careers@{domain}>"
+    message['To'] = 'me@example.com'
+    message['Subject'] = 'Interview invitation - Python Developer'
+    message['Date'] = format_datetime(datetime.now().astimezone())
+    message['Message-ID'] = f"<invite{number}@example.com>"
+    return message.as_bytes()
+
+
+def bench_idle(args):
+    """Latency from mail delivery to the recorded response with the IMAP IDLE listener"""
+    import json
+    import logging
+    from src.email_tracker import EmailResponseTracker
+    from src.fake_servers import FakeImapServer, synthetic_mailbox
+    from src.inbox_listener import InboxListener
+    from src.job_store import JobStore
+
+    logging.disable(logging.INFO)
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'job_config.json')) as f:
+        config = json.load(f)
+    companies = [f"Company {number}" for number in range(args.messages)]
+
+    with tempfile.TemporaryDirectory() as tmp, FakeImapServer(synthetic_mailbox(200, ['Other Corp'])) as imap_server:
+        host, port = imap_server.address
+        config['data_dir'] = tmp
+        config['email_config'].update(
+            email='bench@example.com', password='bench', imap_server=host, imap_port=port, imap_ssl=False,
+            idle_backoff_seconds=0.1
+        )
+        store = JobStore(os.path.join(tmp, 'jobs.db'))
+        job_ids = [
+            store.add_job({'Title': 'Python Developer', 'Company': company, 'Website_Link': f"https://example.com/{number}", 'Status': 'Applied'})
+            for number, company in enumerate(companies)
+        ]
+        store.conn.commit()
+
+        tracker = EmailResponseTracker(config, store)
+        listener = InboxListener(tracker)
+        thread = threading.Thread(target=listener.run, daemon=True)
+        thread.start()
+        # Let the listener connect and catch up on the existing mailbox
+        while not tracker.load_sync_state(config['email_config'].get('mailbox', 'inbox')):
+            time.sleep(0.01)
+
+        latencies = []
+        for number, (company, job_id) in enumerate(zip(companies, job_ids)):
+            if args.drop_every and number and number % args.drop_every == 0:
+                imap_server.drop_connections()
+            started = time.perf_counter()
+            imap_server.add_message(interview_invite(company, number))
+            while not store.get_jobs([job_id])['Recruiter_Response'].notna().all():
+                if time.perf_counter() - started > 30:
+                    break
+                time.sleep(0.002)
+            latencies.append(time.perf_counter() - started)
+
+        listener.stop()
+        thread.join()
+        tracker.close()
+        store.close()
+
+    latencies.sort()
+    print(f"{len(latencies)} interview invitations delivered one at a time, "
+          f"connection dropped every {args.drop_every or 'never'} messages ({listener.reconnects} reconnects)")
+    print(f"  delivery -> response recorded: p50 {statistics.median(latencies) * 1000:.1f}ms, "
+          f"p95 {latencies[int(0.95 * (len(latencies) - 1))] * 1000:.1f}ms, max {latencies[-1] * 1000:.1f}ms")
+
+
+class PeakRss:
+    """Sample this process's RSS (children included) in the background and keep the peak"""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        from src.browser_pool import process_tree_rss_mb
+
+        while True:
+            self.peak = max(self.peak, process_tree_rss_mb(os.getpid()) or 0.0)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_stage(report, name, unit, latency_timer, func):
+    """Run one stage with fresh metrics; func returns the number of items it processed"""
+    from src.metrics import metrics
+
+    metrics.reset()
+    with PeakRss() as rss:
+        started = time.perf_counter()
+        items = func()
+        elapsed = time.perf_counter() - started
+    snapshot = metrics.snapshot()
+
+    timer = snapshot['timers'].get(latency_timer, {})
+    report.append({
+        'stage': name,
+        'items': items,
+        'unit': unit,
+        'seconds': elapsed,
+        'throughput': items / elapsed if elapsed > 0 else 0.0,
+        'latency_timer': latency_timer,
+        'latency': {key: timer.get(key, 0.0) for key in ('count', 'p50', 'p95', 'p99', 'max')},
+        'peak_rss_mb': rss.peak,
+        'metrics': snapshot
+    })
+    latency = report[-1]['latency']
+    print(
+        f"  {name:<28} {items:>7} {unit:<6} {elapsed:>7.2f}s {report[-1]['throughput']:>9,.0f} {unit}/s  "
+        f"{latency_timer} p50/p95/p99 {latency['p50'] * 1000:.1f}/{latency['p95'] * 1000:.1f}/"
+        f"{latency['p99'] * 1000:.1f}ms (n={latency['count']})  peak RSS {rss.peak:.0f} MB"
+    )
+
+
+def suite_config(tmp, portal_server, imap_server, emails):
+    """The project config pointed at the local servers, with data kept under tmp"""
+    import json
+
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'job_config.json')) as f:
+        config = json.load(f)
+
+    config['data_dir'] = tmp
+    config['delay_between_requests'] = 0
+    config['max_jobs_per_run'] = max(portal_server.page_sizes.values())
+    config['http_cache'] = dict(config.get('http_cache', {}), enabled=False)
+    config['metrics'] = dict(config.get('metrics', {}), enabled=False)
+    for portal, portal_config in config['portals'].items():
+        portal_config.update(
+            enabled=True,
+            backend='http',
+            page_url=portal_server.page_url(portal),
+            page_size=portal_server.page_sizes[portal],
+            max_pages=portal_server.pages_per_search
+        )
+    host, port = imap_server.address
+    config['email_config'].update(
+        email='bench@example.com',
+        password='bench',
+        imap_server=host,
+        imap_port=port,
+        imap_ssl=False,
+        max_messages_per_run=emails
+    )
+
+    config_file = os.path.join(tmp, 'job_config.json')
+    with open(config_file, 'w') as f:
+        json.dump(config, f, indent=2)
+    return config_file
+
+
+def bench_suite(args):
+    """Offline end-to-end suite: scraping from a local portal server, email from a fake IMAP server, workbook sync"""
+    import json
+    import logging
+    import pandas as pd
+    from src.fake_servers import FakeImapServer, PortalServer, synthetic_mailbox
+    from src.job_store import JobStore
+    from src.job_tracker import JobTrackingAgent
+    from src.metrics import metrics
+
+    companies = [company_name(number) for number in range(args.companies)]
+    if args.mbox:
+        imap_server = FakeImapServer.from_mbox(args.mbox, latency=args.latency)
+    else:
+        imap_server = FakeImapServer(synthetic_mailbox(args.emails, companies), latency=args.latency)
+    portal_server = PortalServer(companies, args.pages, html_dir=args.html_dir, latency=args.latency)
+
+    report = []
+    print(
+        f"Offline suite: {len(imap_server)} emails, {args.pages} result pages per search"
+        f"{' (recorded HTML)' if args.html_dir else ''}, {args.latency * 1000:.0f}ms simulated latency"
+    )
+    with tempfile.TemporaryDirectory() as tmp, portal_server, imap_server:
+        if not args.verbose:
+            logging.disable(logging.INFO)
+        agent = JobTrackingAgent(suite_config(tmp, portal_server, imap_server, len(imap_server)))
+        try:
+            # Applications the synthetic recruiter replies refer to
+            titles = ['Python Developer', 'Software Engineer', 'Data Scientist', 'Backend Developer']
+            applied_date = time.strftime('%Y-%m-%d')
+            agent.store.add_new_jobs([
+                dict(row, Title=titles[number // len(companies)], Company=companies[number % len(companies)],
+                     Status='Applied', Date_Applied=applied_date)
+                for number, row in enumerate(synthetic_rows(2 * len(companies), seed=3))
+            ])
+
+            responses = []
+
+            def scrape():
+                agent.check_for_new_jobs()
+                return metrics.snapshot()['counters'].get('jobs_scraped', 0)
+
+            def fetch_email():
+                responses.extend(agent.fetch_recruiter_responses())
+                return len(imap_server)
+
+            def match_responses():
+                agent.check_recruiter_responses(responses)
+                return len(responses)
+
+            run_stage(report, 'scrape', 'jobs', 'http_page', scrape)
+            run_stage(report, 'email_fetch', 'emails', 'imap_fetch', fetch_email)
+            run_stage(report, 'response_matching', 'emails', 'response_matching', match_responses)
+        finally:
+            agent.cleanup()
+
+        for rows in args.rows:
+            excel_file = os.path.join(tmp, f"jobs_{rows}.xlsx")
+            started = time.perf_counter()
+            pd.DataFrame(synthetic_rows(rows)).to_excel(excel_file, index=False)
+            print(f"  (generated a {rows}-row workbook in {time.perf_counter() - started:.1f}s)")
+
+            store = JobStore(os.path.join(tmp, f"jobs_{rows}.db"))
+            try:
+                run_stage(report, f"excel_import_{rows}", 'rows', 'store_import_excel',
+                          lambda: store.import_excel(excel_file))
+
+                new_rows = synthetic_rows(args.new_jobs, seed=1)
+                for row in new_rows:
+                    row['Title'] += ' (new)'
+                    row['Website_Link'] += '-new'
+
+                def add_and_export():
+                    store.add_new_jobs(new_rows)
+                    store.export_excel(excel_file)
+                    return store.count()
+
+                run_stage(report, f"excel_export_{rows}", 'rows', 'store_export_excel', add_and_export)
+
+                # Hand edits: 1% of the rows change status
+                df = pd.read_excel(excel_file)
+                edited = df.sample(frac=0.01, random_state=0).index
+                df.loc[edited, 'Status'] = 'Applied'
+                df.to_excel(excel_file, index=False)
+
+                def sync():
+                    store.sync_from_excel(excel_file)
+                    return len(df)
+
+                run_stage(report, f"excel_sync_{rows}", 'rows', 'store_sync_excel', sync)
+
+                # The common case: nobody touched the workbook since the last sync
+                run_stage(report, f"excel_sync_unchanged_{rows}", 'rows', 'store_sync_excel', sync)
+            finally:
+                store.close()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Report written to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job Tracker Agent benchmarks")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    extraction = subparsers.add_parser('extraction', help="Job card extraction round trips and time per page")
+    extraction.add_argument('portal', help="Portal key from config, e.g. indeed")
+    extraction.add_argument('url', help="Search page URL or a saved HTML file")
+    extraction.add_argument('--repeat', type=int, default=10)
+    extraction.set_defaults(func=bench_extraction)
+
+    store = subparsers.add_parser('store', help="Run time vs. row count for the Excel rewrite and the job store")
+    store.add_argument('--rows', type=int, nargs='+', default=[1000, 5000, 10000])
+    store.add_argument('--new-jobs', type=int, default=20)
+    store.set_defaults(func=bench_store)
+
+    classify = subparsers.add_parser('classify', help="Email keyword classification on a synthetic corpus")
+    classify.add_argument('--emails', type=int, default=10000)
+    classify.add_argument('--keyword-scale', type=int, nargs='+', default=[1, 10])
+    classify.set_defaults(func=bench_classify)
+
+    match = subparsers.add_parser('match', help="Response-to-application matching against many applied jobs")
+    match.add_argument('--responses', type=int, default=200)
+    match.add_argument('--applied', type=int, nargs='+', default=[100, 500])
+    match.add_argument('--skip-legacy', action='store_true', help="Skip the slow per-pair loop")
+    match.set_defaults(func=bench_match)
+
+    signature = subparsers.add_parser('signature', help="Signature company extraction on long quoted replies")
+    signature.add_argument('--emails', type=int, default=5)
+    signature.add_argument('--quote-depth', type=int, nargs='+', default=[10, 50])
+    signature.set_defaults(func=bench_signature)
+
+    idle = subparsers.add_parser('idle', help="Delivery-to-match latency of the IMAP IDLE listener")
+    idle.add_argument('--messages', type=int, default=20)
+    idle.add_argument('--drop-every', type=int, default=0, help="Cut the connection every N messages to exercise reconnects")
+    idle.set_defaults(func=bench_idle)
+
+    suite = subparsers.add_parser('suite', help="Offline end-to-end run against local portal and IMAP servers")
+    suite.add_argument('--emails', type=int, default=1000, help="Size of the synthetic mailbox")
+    suite.add_argument('--mbox', help="Serve this mbox file instead of a synthetic mailbox")
+    suite.add_argument('--html-dir', help="Serve recorded pages <portal>_<page>.html from this directory")
+    suite.add_argument('--pages', type=int, default=3, help="Result pages per search")
+    suite.add_argument('--companies', type=int, default=200)
+    suite.add_argument('--rows', type=int, nargs='*', default=[1000, 10000, 100000], help="Synthetic workbook sizes")
+    suite.add_argument('--new-jobs', type=int, default=20)
+    suite.add_argument('--latency', type=float, default=0.0, help="Simulated server latency per request, in seconds")
+    suite.add_argument('--output', help="Write the full report (with all timers) as JSON")
+    suite.add_argument('--verbose', action='store_true', help="Keep the agent's INFO logging")
+    suite.set_defaults(func=bench_suite)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
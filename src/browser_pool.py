@@ -0,0 +1,181 @@
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants, in MB (Linux only)"""
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            if current == pid:
+                return None
+    return total_kb / 1024
+
+
+class WebDriverPool:
+    """Bounded pool of WebDriver sessions shared by scraping threads
+
+    Sessions are started lazily on first use, health-checked before being
+    handed out again and recycled once they have served max_page_loads pages
+    or their browser process tree grows past max_rss_mb (0 disables either).
+    """
+
+    def __init__(self, driver_factory, size=1, max_page_loads=0, max_rss_mb=0):
+        self.driver_factory = driver_factory
+        self.size = max(1, int(size))
+        self.max_page_loads = max_page_loads
+        self.max_rss_mb = max_rss_mb
+        self.logger = logging.getLogger(__name__)
+        self._idle = queue.LifoQueue()
+        self._drivers = set()
+        self._reserved = 0
+        self._page_loads = {}
+        self._lock = threading.Lock()
+
+    def _create_driver(self):
+        """Start a new session if the pool still has room"""
+        with self._lock:
+            if len(self._drivers) + self._reserved >= self.size:
+                return None
+            # Reserve the slot before the (slow) browser launch
+            self._reserved += 1
+
+        try:
+            driver = self.driver_factory()
+        except BaseException:
+            with self._lock:
+                self._reserved -= 1
+            raise
+
+        # Reservation becomes a registered session in one step, so the slot is never seen free
+        with self._lock:
+            self._reserved -= 1
+            self._drivers.add(driver)
+            self._page_loads[id(driver)] = 0
+            active = len(self._drivers)
+        self.logger.info(f"Started WebDriver session ({active}/{self.size} active)")
+        return driver
+
+    def _discard(self, driver, reason):
+        """Quit a session and free its slot"""
+        with self._lock:
+            self._drivers.discard(driver)
+            page_loads = self._page_loads.pop(id(driver), 0)
+        self.logger.info(f"Recycling WebDriver session after {page_loads} page loads: {reason}")
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Error closing WebDriver session: {e}")
+
+    def _is_healthy(self, driver):
+        """Cheap liveness probe: any command fails once the browser has died"""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _recycle_reason(self, driver):
+        """Why the session should be retired after this lease, or None"""
+        page_loads = self._page_loads.get(id(driver), 0)
+        if self.max_page_loads and page_loads >= self.max_page_loads:
+            return f"reached {self.max_page_loads} page loads"
+
+        if self.max_rss_mb:
+            process = getattr(getattr(driver, 'service', None), 'process', None)
+            rss_mb = process_tree_rss_mb(process.pid) if process else None
+            if rss_mb is not None and rss_mb > self.max_rss_mb:
+                return f"using {rss_mb:.0f} MB (limit {self.max_rss_mb} MB)"
+        return None
+
+    def record_page_load(self, driver):
+        """Count a page load against the session's recycle budget"""
+        with self._lock:
+            if id(driver) in self._page_loads:
+                self._page_loads[id(driver)] += 1
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a healthy driver, creating one lazily when the pool is not yet full"""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._create_driver()
+                if driver is not None:
+                    break
+                # Poll so a slot freed by a recycled session is noticed too
+                try:
+                    driver = self._idle.get(timeout=1)
+                except queue.Empty:
+                    continue
+
+            if self._is_healthy(driver):
+                break
+            self._discard(driver, "failed health check")
+
+        try:
+            yield driver
+        finally:
+            reason = self._recycle_reason(driver)
+            if reason:
+                self._discard(driver, reason)
+            else:
+                self._idle.put(driver)
+
+    def close_all(self):
+        """Quit every session owned by the pool"""
+        with self._lock:
+            drivers = list(self._drivers)
+            self._drivers = set()
+            self._page_loads = {}
+        self._idle = queue.LifoQueue()
+
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                self.logger.warning(f"Error closing WebDriver session: {e}")
+        return len(drivers)
+
+
+class PortalRateLimiter:
+    """Enforce a minimum delay between requests to the same portal"""
+
+    def __init__(self, default_delay=2, portal_delays=None):
+        self.default_delay = default_delay
+        self.portal_delays = portal_delays or {}
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+    def delay_for(self, portal):
+        """Minimum seconds between two requests to the portal"""
+        return self.portal_delays.get(portal, self.default_delay)
+
+    def wait(self, portal):
+        """Block until the portal may be hit again and reserve the next slot"""
+        delay = self.delay_for(portal)
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_allowed.get(portal, now))
+            self._next_allowed[portal] = start_at + delay
+
+        sleep_for = start_at - now
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+        return sleep_for
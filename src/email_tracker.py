@@ -1,31 +1,124 @@
 import imaplib
 import email
 from email.header import decode_header
-import pandas as pd
 from datetime import datetime, timedelta
 import re
+import json
 import logging
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.job_store import JobStore
+from src.imap_fetch import compress_uid_set, parse_fetch_response, text_plain_sections, decode_part
+from src.keyword_matcher import KeywordMatcher, DEFAULT_EMAIL_KEYWORDS
+from src.response_matcher import ApplicationMatcher, response_tokens
+from src.metrics import metrics
+
+# Phase one of the fetch: just enough to pre-filter and to locate text parts
+HEADER_FETCH_ITEMS = '(UID BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS (FROM SUBJECT DATE)])'
+
+# Sender domains (first label or full domain) that say nothing about the company
+DEFAULT_FREE_MAIL_DOMAINS = ['gmail', 'yahoo', 'outlook', 'hotmail', 'aol', 'icloud']
+
+# The email_config settings parsing and classification depend on (see classifier_config)
+CLASSIFIER_EMAIL_SETTINGS = ('free_mail_domains', 'signature_window_chars')
+
+# Signatures are searched in the last this many characters of the new text only
+SIGNATURE_WINDOW_CHARS = 2000
+
+# Where the quoted part of a reply starts ("On <date>, <name> wrote:", "> ..." or an Outlook header)
+QUOTE_START = re.compile(
+    r'^(?:On .{0,200}wrote:[ \t\r]*$|>|-{2,}[ \t]*Original Message[ \t]*-{2,})',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Compiled once at import; only ever run over a bounded signature window
+SIGNATURE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+        r'Best regards,\s*\n.*?\n(.*?)(?:\n|$)',
+        r'Sincerely,\s*\n.*?\n(.*?)(?:\n|$)',
+        r'Thanks,\s*\n.*?\n(.*?)(?:\n|$)',
+        r'(\w+\s+\w+)\s*\|\s*(.+?)(?:\n|$)',
+        r'From:\s*(.+?)(?:\n|$)'
+    )
+]
 
 class EmailResponseTracker:
-    def __init__(self, config):
+    def __init__(self, config, store=None, parse_pool_owner=None):
         self.config = config
         self.email_config = config['email_config']
-        self.excel_file = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            'data',
-            config['excel_file']
-        )
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        data_dir = os.path.join(project_root, config.get('data_dir', 'data'))
+        self.excel_file = os.path.join(data_dir, config['excel_file'])
         self.logger = logging.getLogger(__name__)
+        self.last_fetch_stats = {'round_trips': 0, 'bytes': 0, 'failed': 0, 'deferred': 0}
+        self.setup_classifiers()
+        
+        # Process pool for parsing and classification, started on first use
+        # (or borrowed from another tracker, as the profiles of one agent do);
+        # chunks carry this tracker's classifier config, so a shared pool
+        # classifies each profile's mail with that profile's settings
+        self.classifier_config = {
+            'email_config': {key: self.email_config[key] for key in CLASSIFIER_EMAIL_SETTINGS if key in self.email_config},
+            'email_keywords': config.get('email_keywords', {})
+        }
+        self._parse_pool = None
+        self._parse_pool_lock = threading.Lock()
+        self.parse_pool_owner = parse_pool_owner
+        
+        # Share the agent's store when given one, otherwise open the same database
+        if store is None:
+            store = JobStore(os.path.join(data_dir, config.get('database_file', 'job_tracker.db')))
+            store.import_excel(self.excel_file)
+            # Pick up hand edits (rows moved to Applied); a no-op when the workbook is unchanged
+            store.sync_from_excel(self.excel_file)
+        self.store = store
     
+    @classmethod
+    def for_parsing(cls, config):
+        """Tracker that only parses and classifies messages (no job store), for pool workers"""
+        tracker = cls.__new__(cls)
+        tracker.config = config
+        tracker.email_config = config['email_config']
+        tracker.logger = logging.getLogger(__name__)
+        tracker.setup_classifiers()
+        return tracker
+    
+    def setup_classifiers(self):
+        """Build the keyword matchers once (each covers the categories one check needs) and the company lookups"""
+        self.free_mail_domains = {
+            domain.lower() for domain in self.email_config.get('free_mail_domains', DEFAULT_FREE_MAIL_DOMAINS)
+        }
+        self.signature_window = self.email_config.get('signature_window_chars', SIGNATURE_WINDOW_CHARS)
+        # Sender domain -> company name (None for free-mail providers)
+        self._domain_companies = {}
+        
+        keyword_sets = dict(DEFAULT_EMAIL_KEYWORDS)
+        keyword_sets.update(self.config.get('email_keywords', {}))
+        self.job_matcher = KeywordMatcher({name: keyword_sets[name] for name in ('job', 'spam')})
+        self.sender_matcher = KeywordMatcher({'automated_sender': keyword_sets['automated_sender']})
+        self.response_matcher = KeywordMatcher({
+            name: keyword_sets[name] for name in ('auto_reply', 'rejection', 'interview', 'interest')
+        })
+    
+    def is_configured(self) -> bool:
+        """Whether email credentials were filled in (not the placeholders of the sample config)"""
+        return self.email_config.get('email', 'your_email@gmail.com') != 'your_email@gmail.com'
+    
+    @metrics.timed('imap_connect')
     def connect_to_email(self):
         """Connect to email server"""
         try:
-            if self.email_config['email'] == 'your_email@gmail.com':
+            if not self.is_configured():
                 self.logger.warning("Email not configured")
                 return None
                 
-            mail = imaplib.IMAP4_SSL(
+            # Plain IMAP only for local test servers (imap_ssl: false)
+            imap_class = imaplib.IMAP4_SSL if self.email_config.get('imap_ssl', True) else imaplib.IMAP4
+            mail = imap_class(
                 self.email_config['imap_server'], 
                 self.email_config['imap_port']
             )
@@ -36,41 +129,47 @@ class EmailResponseTracker:
             self.logger.error(f"Error connecting to email: {e}")
             return None
     
+    def company_from_domain(self, sender):
+        """Company named by the sender's domain, memoized per domain (None for free-mail providers)"""
+        if '@' not in sender:
+            return None
+        domain = sender.split('@')[1].strip(' >').lower()
+        if domain not in self._domain_companies:
+            # Company name from the first label: "jobs@acme-robotics.com" -> "Acme Robotics"
+            company_domain = domain.split('.')[0]
+            if company_domain in self.free_mail_domains or domain in self.free_mail_domains:
+                self._domain_companies[domain] = None
+            else:
+                self._domain_companies[domain] = company_domain.replace('-', ' ').title()
+        return self._domain_companies[domain]
+    
+    def signature_text(self, email_content):
+        """The part of a message a signature can be in: the new text above any quoted reply, last signature_window chars"""
+        quote = QUOTE_START.search(email_content)
+        if quote:
+            email_content = email_content[:quote.start()]
+        return email_content[-self.signature_window:]
+    
     def extract_company_from_email(self, email_content, sender):
         """Extract company name from email content or sender"""
         try:
             # Try to extract from sender domain
-            if '@' in sender:
-                domain = sender.split('@')[1].lower()
-                # Remove common email suffixes and get company name
-                company_domain = domain.split('.')[0]
-                
-                # Skip common email providers
-                skip_domains = ['gmail', 'yahoo', 'outlook', 'hotmail', 'aol', 'icloud']
-                if company_domain not in skip_domains:
-                    return company_domain.replace('-', ' ').title()
+            company = self.company_from_domain(sender)
+            if company:
+                return company
             
             # Try to extract from email signature or content
-            signature_patterns = [
-                r'Best regards,\s*\n.*?\n(.*?)(?:\n|$)',
-                r'Sincerely,\s*\n.*?\n(.*?)(?:\n|$)',
-                r'Thanks,\s*\n.*?\n(.*?)(?:\n|$)',
-                r'(\w+\s+\w+)\s*\|\s*(.+?)(?:\n|$)',
-                r'From:\s*(.+?)(?:\n|$)'
-            ]
-            
-            for pattern in signature_patterns:
-                matches = re.findall(pattern, email_content, re.IGNORECASE | re.MULTILINE)
-                if matches:
-                    for match in matches:
-                        if isinstance(match, tuple):
-                            company = match[1] if len(match) > 1 else match[0]
-                        else:
-                            company = match
-                        
-                        company = company.strip()
-                        if len(company.split()) <= 3 and len(company) > 2:
-                            return company
+            text = self.signature_text(email_content)
+            for pattern in SIGNATURE_PATTERNS:
+                for match in pattern.findall(text):
+                    if isinstance(match, tuple):
+                        company = match[1] if len(match) > 1 else match[0]
+                    else:
+                        company = match
+                    
+                    company = company.strip()
+                    if len(company.split()) <= 3 and len(company) > 2:
+                        return company
             
             return "Unknown Company"
             
@@ -78,46 +177,21 @@ class EmailResponseTracker:
             self.logger.warning(f"Error extracting company from email: {e}")
             return "Unknown Company"
     
+    @metrics.timed('email_classify')
     def categorize_response(self, subject, content):
         """Categorize the type of response"""
         try:
-            subject_lower = subject.lower()
-            content_lower = content.lower()
-            
-            # Rejection keywords
-            rejection_keywords = [
-                'unfortunately', 'regret', 'not moving forward', 'not selected',
-                'decided to go', 'other candidates', 'not the right fit',
-                'will not be', 'have chosen', 'do not meet', 'unsuccessful'
-            ]
-            
-            # Interview keywords  
-            interview_keywords = [
-                'interview', 'schedule', 'next step', 'phone call', 'meet',
-                'discussion', 'chat', 'available', 'calendar', 'zoom',
-                'teams meeting', 'would like to speak', 'set up a time'
-            ]
-            
-            # Interest keywords
-            interest_keywords = [
-                'interested', 'review your', 'impressive', 'experience',
-                'background', 'skills', 'qualified', 'would like to learn more',
-                'tell us more', 'additional information'
-            ]
-            
-            # Auto-reply keywords
-            auto_reply_keywords = [
-                'out of office', 'automatic reply', 'currently away',
-                'will respond', 'received your email'
-            ]
+            category = self.response_matcher.first_category(
+                content, ('auto_reply', 'rejection', 'interview', 'interest')
+            )
             
-            if any(keyword in content_lower for keyword in auto_reply_keywords):
+            if category == 'auto_reply':
                 return 'Auto-Reply'
-            elif any(keyword in content_lower for keyword in rejection_keywords):
+            elif category == 'rejection':
                 return 'Rejection'
-            elif any(keyword in content_lower for keyword in interview_keywords):
+            elif category == 'interview':
                 return 'Interview Request'
-            elif any(keyword in content_lower for keyword in interest_keywords):
+            elif category == 'interest':
                 return 'Interested'
             else:
                 return 'Other'
@@ -126,120 +200,342 @@ class EmailResponseTracker:
             self.logger.warning(f"Error categorizing response: {e}")
             return 'Other'
     
-    def check_for_responses(self, days_back=7):
-        """Check for recruiter responses in email"""
-        mail = self.connect_to_email()
-        if not mail:
-            return []
+    def _sync_state_key(self, mailbox):
+        return f"imap_sync:{self.email_config['email']}:{mailbox}"
+    
+    def load_sync_state(self, mailbox):
+        """Last seen UID and UIDVALIDITY for a mailbox, or {} before the first sync"""
+        try:
+            return json.loads(self.store.get_meta(self._sync_state_key(mailbox), '{}'))
+        except ValueError:
+            return {}
+    
+    def save_sync_state(self, mailbox, uidvalidity, last_uid):
+        """Persist the high-water mark once a batch of messages is processed"""
+        self.store.set_meta(
+            self._sync_state_key(mailbox),
+            json.dumps({'uidvalidity': uidvalidity, 'last_uid': last_uid})
+        )
+    
+    def get_mailbox_uid_info(self, mail, mailbox):
+        """UIDVALIDITY and UIDNEXT of the selected mailbox (None when unknown)"""
+        info = {}
+        for code in ('UIDVALIDITY', 'UIDNEXT'):
+            # SELECT already reported both as response codes
+            _, data = mail.response(code)
+            if data and data[-1]:
+                info[code] = int(data[-1])
         
-        responses = []
+        if len(info) < 2:
+            status, data = mail.status(mailbox, '(UIDVALIDITY UIDNEXT)')
+            text = data[0] if status == 'OK' and data and data[0] else b''
+            for code in ('UIDVALIDITY', 'UIDNEXT'):
+                match = re.search(code.encode() + rb' (\d+)', text)
+                if match:
+                    info.setdefault(code, int(match.group(1)))
         
-        try:
-            mail.select('inbox')
-            
-            # Search for emails from the last few days
+        return info.get('UIDVALIDITY'), info.get('UIDNEXT')
+    
+    @metrics.timed('imap_search')
+    def search_new_uids(self, mail, mailbox, days_back=7):
+        """UIDs of messages that arrived since the last sync
+        
+        Falls back to a SINCE <days_back> search on the first sync or when the
+        mailbox's UIDVALIDITY changed (old UIDs are then meaningless).
+        Returns (uidvalidity, new high-water UID, sorted UIDs to process).
+        """
+        uidvalidity, uidnext = self.get_mailbox_uid_info(mail, mailbox)
+        state = self.load_sync_state(mailbox)
+        last_uid = state.get('last_uid', 0)
+        
+        if state and uidvalidity is not None and state.get('uidvalidity') == uidvalidity:
+            status, data = mail.uid('search', None, f'UID {last_uid + 1}:*')
+            # "n:*" always matches the newest message, even when its UID is below n
+            uids = [int(uid) for uid in data[0].split() if int(uid) > last_uid] if status == 'OK' else []
+            self.logger.info(f"Incremental sync of {mailbox}: {len(uids)} new emails since UID {last_uid}")
+        else:
+            if state:
+                self.logger.info(f"UIDVALIDITY of {mailbox} changed, falling back to the last {days_back} days")
             since_date = (datetime.now() - timedelta(days=days_back)).strftime("%d-%b-%Y")
-            status, message_ids = mail.search(None, f'SINCE {since_date}')
+            status, data = mail.uid('search', None, f'SINCE {since_date}')
+            uids = [int(uid) for uid in data[0].split()] if status == 'OK' and data[0] else []
+            # Everything below UIDNEXT is covered by the date window from now on
+            last_uid = uidnext - 1 if uidnext else 0
+            self.logger.info(f"Found {len(uids)} emails to check in the last {days_back} days")
+        
+        uids.sort()
+        return uidvalidity, max(uids[-1:] + [last_uid]), uids
+    
+    def _uid_fetch(self, mail, uids, items):
+        """One UID FETCH for a set of messages, counted in last_fetch_stats"""
+        with metrics.timer('imap_fetch'):
+            status, data = mail.uid('fetch', compress_uid_set(uids), items)
+        self.last_fetch_stats['round_trips'] += 1
+        received = 0
+        for item in data or []:
+            for piece in (item if isinstance(item, tuple) else (item,)):
+                if isinstance(piece, bytes):
+                    received += len(piece)
+        self.last_fetch_stats['bytes'] += received
+        metrics.count('imap_bytes', received)
+        if status != 'OK':
+            raise imaplib.IMAP4.error(f"UID FETCH failed: {data}")
+        with metrics.timer('imap_response_parsing'):
+            return parse_fetch_response(data)
+    
+    def get_parse_pool(self, message_count):
+        """Process pool for parsing and classification, or None to do it inline
+        
+        email_config.parse_workers sets the pool size (0: one per CPU core);
+        runs with fewer than parse_pool_min_messages messages stay inline,
+        where starting the workers would cost more than it saves. The
+        threshold is capped at max_messages_per_run, which no run exceeds.
+        """
+        if self.parse_pool_owner is not None:
+            return self.parse_pool_owner.get_parse_pool(message_count)
+        workers = self.email_config.get('parse_workers', 0) or os.cpu_count() or 1
+        min_messages = min(
+            self.email_config.get('parse_pool_min_messages', 50),
+            self.email_config.get('max_messages_per_run', 100)
+        )
+        if workers <= 1 or message_count < min_messages:
+            return None
+        # Listener threads of several profiles can ask for the shared pool at once
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                # Spawned rather than forked: scraper threads run alongside the email
+                # fetch, and forking a multi-threaded process can deadlock the child
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_parse_worker,
+                    initargs=(self.classifier_config,)
+                )
+                self.logger.info(f"Started {workers} email parsing processes")
+            return self._parse_pool
+    
+    def process_chunks(self, method, batches, pool=None):
+        """Run a chunk method (parse_header_chunk / classify_chunk) over fetched batches
+        
+        batches is a generator doing the IMAP round trips: each batch is split
+        into parse_chunk_size chunks and handed to the pool as soon as it
+        arrives, so the next FETCH overlaps the parsing of the previous one.
+        Returns {uid: result} merged from all chunks.
+        """
+        chunk_size = max(1, self.email_config.get('parse_chunk_size', 50))
+        results = {}
+        pending = []
+        for batch in batches:
+            for start in range(0, len(batch), chunk_size):
+                chunk = batch[start:start + chunk_size]
+                if pool is None:
+                    results.update(getattr(self, method)(chunk))
+                else:
+                    pending.append((pool.submit(_run_parse_chunk, method, chunk, self.classifier_config), chunk))
+        
+        for future, chunk in pending:
+            try:
+                chunk_results, recorded = future.result()
+                metrics.merge(recorded)
+            except Exception as e:
+                self.logger.warning(f"Email parsing process failed, parsing {len(chunk)} emails inline: {e}")
+                chunk_results = getattr(self, method)(chunk)
+            results.update(chunk_results)
+        return results
+    
+    def parse_header_chunk(self, items):
+        """{uid: headers} for (uid, FETCH fields) pairs of the header phase
+        
+        Headers hold subject, sender, date, the text/plain sections to fetch
+        and whether the message passes the header pre-filter.
+        """
+        headers = {}
+        for uid, fields in items:
+            started = time.perf_counter()
+            try:
+                header_bytes = next(v for k, v in fields.items() if k.startswith('BODY[HEADER'))
+                email_message = email.message_from_bytes(header_bytes or b'')
+                
+                subject = decode_header(email_message["Subject"] or '')[0][0]
+                if isinstance(subject, bytes):
+                    subject = subject.decode()
+                sender = email_message.get("From") or ''
+                
+                headers[uid] = {
+                    'subject': subject,
+                    'sender': sender,
+                    'date_received': email_message.get("Date"),
+                    'sections': text_plain_sections(fields.get('BODYSTRUCTURE')),
+                    'maybe_job_related': self.might_be_job_related(subject, sender)
+                }
+            except Exception as e:
+                self.logger.warning(f"Error parsing headers of email UID {uid}: {e}")
+            metrics.observe('email_parsing', time.perf_counter() - started)
+        return headers
+    
+    def classify_chunk(self, items):
+        """{uid: response dict, or None if not job related} for (uid, headers, FETCH fields) of the body phase"""
+        responses = {}
+        for uid, headers, fields in items:
+            started = time.perf_counter()
+            content = ""
+            for section, encoding, charset in headers['sections']:
+                payload = fields.get(f"BODY[{section}]")
+                if payload:
+                    try:
+                        content += decode_part(payload, encoding, charset)
+                    except Exception as e:
+                        self.logger.warning(f"Error decoding part {section} of email UID {uid}: {e}")
+            metrics.observe('email_parsing', time.perf_counter() - started)
             
-            if status == 'OK' and message_ids[0]:
-                message_ids = message_ids[0].split()
-                self.logger.info(f"Found {len(message_ids)} emails to check")
+            responses[uid] = None
+            try:
+                subject = headers['subject']
+                sender = headers['sender']
                 
-                # Check last 100 emails maximum
-                for msg_id in message_ids[-100:]:
+                # Check if this might be a job-related response
+                if self.is_job_related(subject, content, sender):
+                    responses[uid] = {
+                        'sender': sender,
+                        'subject': subject,
+                        'content': content[:1000],  # First 1000 chars
+                        'date_received': headers['date_received'],
+                        'company': self.extract_company_from_email(content, sender),
+                        'response_type': self.categorize_response(subject, content)
+                    }
+            except Exception as e:
+                self.logger.warning(f"Error processing email UID {uid}: {e}")
+        return responses
+    
+    def fetch_headers(self, mail, uids, pool=None, failed=None):
+        """Bulk-fetch From/Subject/Date and BODYSTRUCTURE, batch_size UIDs per command
+        
+        UIDs of batches whose FETCH failed are added to the failed set.
+        """
+        batch_size = self.email_config.get('fetch_batch_size', 200)
+        
+        def batches():
+            for start in range(0, len(uids), batch_size):
+                batch = uids[start:start + batch_size]
+                try:
+                    fetched = self._uid_fetch(mail, batch, HEADER_FETCH_ITEMS)
+                except Exception as e:
+                    self.logger.warning(f"Error fetching headers for {len(batch)} emails: {e}")
+                    if failed is not None:
+                        failed.update(batch)
+                    continue
+                yield list(fetched.items())
+        
+        return self.process_chunks('parse_header_chunk', batches(), pool)
+    
+    def fetch_and_classify(self, mail, headers_by_uid, pool=None, failed=None):
+        """Fetch the text/plain parts of the given messages and classify them
+        
+        Messages with the same part layout (usually just "1" or "1.1") share
+        one UID FETCH per batch. Returns {uid: response dict or None}; UIDs
+        of batches whose FETCH failed are added to the failed set.
+        """
+        batch_size = self.email_config.get('fetch_batch_size', 200)
+        groups = {}
+        for uid, headers in headers_by_uid.items():
+            groups.setdefault(tuple(headers['sections']), []).append(uid)
+        
+        def batches():
+            # Messages without a text/plain part are classified on their headers alone
+            if () in groups:
+                yield [(uid, headers_by_uid[uid], {}) for uid in groups.pop(())]
+            for sections, uids in groups.items():
+                items = '(UID ' + ' '.join(f"BODY.PEEK[{section}]" for section, _, _ in sections) + ')'
+                for start in range(0, len(uids), batch_size):
+                    batch = uids[start:start + batch_size]
                     try:
-                        status, msg_data = mail.fetch(msg_id, '(RFC822)')
-                        email_body = msg_data[0][1]
-                        email_message = email.message_from_bytes(email_body)
-                        
-                        # Extract email details
-                        subject = decode_header(email_message["Subject"])[0][0]
-                        if isinstance(subject, bytes):
-                            subject = subject.decode()
-                        
-                        sender = email_message.get("From")
-                        date_received = email_message.get("Date")
-                        
-                        # Get email content
-                        content = self.extract_email_content(email_message)
-                        
-                        # Check if this might be a job-related response
-                        if self.is_job_related(subject, content, sender):
-                            company = self.extract_company_from_email(content, sender)
-                            response_type = self.categorize_response(subject, content)
-                            
-                            response = {
-                                'sender': sender,
-                                'subject': subject,
-                                'content': content[:1000],  # First 1000 chars
-                                'date_received': date_received,
-                                'company': company,
-                                'response_type': response_type
-                            }
-                            responses.append(response)
-                    
+                        fetched = self._uid_fetch(mail, batch, items)
                     except Exception as e:
-                        self.logger.warning(f"Error processing email {msg_id}: {e}")
+                        self.logger.warning(f"Error fetching bodies for {len(batch)} emails: {e}")
+                        if failed is not None:
+                            failed.update(batch)
                         continue
-            
+                    yield [(uid, headers_by_uid[uid], fields) for uid, fields in fetched.items()]
+        
+        return self.process_chunks('classify_chunk', batches(), pool)
+    
+    def check_for_responses(self, days_back=7):
+        """Check for recruiter responses in email received since the last sync"""
+        mail = self.connect_to_email()
+        if not mail:
+            return []
+        
+        responses = []
+        try:
+            mail.select(self.email_config.get('mailbox', 'inbox'))
+            responses = self.fetch_new_responses(mail, days_back)
             mail.close()
             mail.logout()
-            self.logger.info(f"Found {len(responses)} job-related emails")
-            
         except Exception as e:
             self.logger.error(f"Error checking emails: {e}")
         
         return responses
     
-    def extract_email_content(self, email_message):
-        """Extract text content from email"""
-        content = ""
+    def fetch_new_responses(self, mail, days_back=7):
+        """Fetch and classify the emails received since the last sync, on a connection with the mailbox selected"""
+        self.last_fetch_stats = {'round_trips': 0, 'bytes': 0, 'failed': 0, 'deferred': 0}
+        mailbox = self.email_config.get('mailbox', 'inbox')
+        max_messages = self.email_config.get('max_messages_per_run', 100)
         
-        try:
-            if email_message.is_multipart():
-                for part in email_message.walk():
-                    if part.get_content_type() == "text/plain":
-                        try:
-                            payload = part.get_payload(decode=True)
-                            if payload:
-                                content += payload.decode('utf-8', errors='ignore')
-                        except Exception as e:
-                            self.logger.warning(f"Error decoding email part: {e}")
-            else:
-                try:
-                    payload = email_message.get_payload(decode=True)
-                    if payload:
-                        content = payload.decode('utf-8', errors='ignore')
-                except Exception as e:
-                    self.logger.warning(f"Error decoding email: {e}")
-                    
-        except Exception as e:
-            self.logger.error(f"Error extracting email content: {e}")
+        uidvalidity, high_water_uid, uids = self.search_new_uids(mail, mailbox, days_back)
+        
+        # Oldest first, up to the per-run maximum: a larger backlog is worked off over the next runs
+        uids, skipped = uids[:max_messages], uids[max_messages:]
+        failed = set()
+        
+        # Parsing and classification go to worker processes on large runs
+        pool = self.get_parse_pool(len(uids))
+        
+        # Phase one: headers and structure for the whole UID range
+        headers = self.fetch_headers(mail, uids, pool, failed)
+        if self.email_config.get('header_prefilter', True):
+            candidates = [uid for uid in uids if uid in headers and headers[uid]['maybe_job_related']]
+        else:
+            candidates = [uid for uid in uids if uid in headers]
+        self.logger.info(f"{len(candidates)} of {len(headers)} emails passed the header pre-filter")
         
-        return content
+        # Phase two: only the text/plain parts of the survivors
+        classified = self.fetch_and_classify(mail, {uid: headers[uid] for uid in candidates}, pool, failed)
+        
+        # Results arrive per chunk; report them in UID order
+        responses = [classified[uid] for uid in candidates if classified.get(uid)]
+        
+        # Emails that failed to fetch or were left for the next run are searched again then
+        self.last_fetch_stats.update(failed=len(failed), deferred=len(skipped))
+        unprocessed = failed.union(skipped)
+        if unprocessed:
+            high_water_uid = min(unprocessed) - 1
+            self.logger.info(f"{len(failed)} emails failed to fetch and {len(skipped)} were left for the next run")
+        if uidvalidity is not None:
+            self.save_sync_state(mailbox, uidvalidity, high_water_uid)
+        
+        self.logger.info(f"Found {len(responses)} job-related emails")
+        self.logger.info(
+            f"IMAP transfer: {self.last_fetch_stats['bytes'] / 1024:.1f} KB "
+            f"in {self.last_fetch_stats['round_trips']} FETCH round trips"
+        )
+        return responses
     
+    @metrics.timed('email_classify')
     def is_job_related(self, subject, content, sender):
         """Determine if email is job application related"""
         try:
-            job_keywords = [
-                'application', 'position', 'role', 'interview', 'resume',
-                'cv', 'candidate', 'hiring', 'recruitment', 'job',
-                'opportunity', 'thank you for applying', 'your interest'
-            ]
-            
-            text_to_check = (subject + ' ' + content + ' ' + sender).lower()
+            counts = self.job_matcher.counts(subject + ' ' + content + ' ' + sender)
             
             # Count job-related keywords
-            keyword_count = sum(keyword in text_to_check for keyword in job_keywords)
+            keyword_count = counts['job']
             
             # Skip obvious spam/automated emails unless they have strong job indicators
-            spam_indicators = ['unsubscribe', 'marketing', 'promotion', 'deal', 'sale']
-            if any(indicator in text_to_check for indicator in spam_indicators):
+            if counts['spam']:
                 return keyword_count >= 3
             
             # Skip automated system emails unless job-related
-            automated_senders = ['noreply', 'no-reply', 'donotreply', 'automated']
-            if any(auto in sender.lower() for auto in automated_senders):
+            if self.sender_matcher.counts(sender)['automated_sender']:
                 return keyword_count >= 2
             
             return keyword_count >= 1
@@ -248,89 +544,66 @@ class EmailResponseTracker:
             self.logger.warning(f"Error checking if email is job-related: {e}")
             return False
     
+    def might_be_job_related(self, subject, sender):
+        """Cheap header-only pre-filter run before any message body is fetched
+        
+        Derived from is_job_related: a job keyword in the subject or sender is
+        enough to fetch the body. Without one, automated and promotional mail
+        would need several keyword hits in the body and is dropped; mail from
+        people is kept so the body can decide.
+        """
+        counts = self.job_matcher.counts(subject + ' ' + sender)
+        if counts['job']:
+            return True
+        if self.sender_matcher.counts(sender)['automated_sender']:
+            return False
+        if counts['spam']:
+            return False
+        return True
+    
+    @metrics.timed('response_matching')
     def match_responses_to_applications(self, responses):
-        """Match email responses to job applications in Excel"""
+        """Match email responses to job applications in the job store"""
         try:
-            if not os.path.exists(self.excel_file):
-                self.logger.warning(f"Excel file not found: {self.excel_file}")
-                return 0
-                
-            df = pd.read_excel(self.excel_file)
-            applied_jobs = df[df['Status'] == 'Applied'].copy()
+            # Only applications sharing a token with a response's sender domain,
+            # company or subject are candidates for it
+            tokens = [response_tokens(response) for response in responses]
+            postings = self.store.find_applications(set().union(*tokens), self.email_config.get('max_token_postings', 50))
+            candidates = [set().union(*(postings.get(token, ()) for token in response)) for response in tokens]
+            applied_jobs = self.store.get_jobs(set().union(*candidates))
             
             if applied_jobs.empty:
-                self.logger.info("No applied jobs found to match responses")
+                self.logger.info("No applied jobs share a company or domain token with the responses")
                 return 0
             
             matches_made = 0
             
-            for response in responses:
-                best_match = None
-                best_score = 0
-                
-                for idx, job in applied_jobs.iterrows():
-                    score = 0
-                    company_name = str(job['Company']).lower()
-                    response_company = response['company'].lower()
-                    
-                    # Company name matching (highest priority)
-                    if company_name in response_company or response_company in company_name:
-                        score += 5
-                    
-                    # Check if company name appears in sender domain
-                    if '@' in response['sender']:
-                        domain = response['sender'].split('@')[1].lower()
-                        company_clean = company_name.replace(' ', '').replace('-', '')
-                        if company_clean in domain.replace('-', '').replace('.', ''):
-                            score += 3
-                    
-                    # Job title matching
-                    job_title = str(job['Title']).lower()
-                    title_words = job_title.split()
-                    subject_lower = response['subject'].lower()
-                    
-                    for word in title_words:
-                        if len(word) > 3 and word in subject_lower:
-                            score += 1
-                    
-                    # Date proximity (applied recently = more likely to get response)
-                    if pd.notna(job['Date_Applied']):
-                        try:
-                            applied_date = pd.to_datetime(job['Date_Applied'])
-                            days_since_applied = (datetime.now() - applied_date).days
-                            if days_since_applied <= 7:
-                                score += 2
-                            elif days_since_applied <= 14:
-                                score += 1
-                        except:
-                            pass
+            # Score every response against its candidate applications at once
+            matcher = ApplicationMatcher(applied_jobs)
+            best_matches = matcher.best_matches(responses, candidates)
+            
+            for response, best_match in zip(responses, best_matches):
+                # Record the response if we found a good match
+                if best_match is not None:
+                    # Create detailed notes
+                    notes = f"From: {response['sender']}\n"
+                    notes += f"Subject: {response['subject']}\n"
+                    notes += f"Type: {response['response_type']}\n"
+                    notes += f"Content Preview: {response['content'][:300]}..."
                     
-                    if score > best_score:
-                        best_score = score
-                        best_match = idx
-                
-                # Update the Excel file if we found a good match
-                if best_match is not None and best_score >= 3:
-                    # Check if response is already recorded
-                    if pd.isna(df.loc[best_match, 'Recruiter_Response']) or df.loc[best_match, 'Recruiter_Response'] == '':
-                        df.loc[best_match, 'Recruiter_Response'] = response['response_type']
-                        df.loc[best_match, 'Response_Date'] = datetime.now().strftime('%Y-%m-%d')
-                        
-                        # Create detailed notes
-                        notes = f"From: {response['sender']}\n"
-                        notes += f"Subject: {response['subject']}\n"
-                        notes += f"Type: {response['response_type']}\n"
-                        notes += f"Content Preview: {response['content'][:300]}..."
-                        
-                        df.loc[best_match, 'Notes'] = notes
+                    # Only recorded if no response is stored for the job yet
+                    if self.store.record_response(
+                        best_match,
+                        response['response_type'],
+                        datetime.now().strftime('%Y-%m-%d'),
+                        notes
+                    ):
                         matches_made += 1
-                        
-                        self.logger.info(f"Matched response to: {df.loc[best_match, 'Title']} at {df.loc[best_match, 'Company']}")
+                        self.logger.info(f"Matched response to: {applied_jobs.loc[best_match, 'Title']} at {applied_jobs.loc[best_match, 'Company']}")
             
-            # Save updated Excel file
+            metrics.count('responses_matched', matches_made)
             if matches_made > 0:
-                df.to_excel(self.excel_file, index=False)
-                self.logger.info(f"Updated Excel file with {matches_made} recruiter responses")
+                self.logger.info(f"Recorded {matches_made} recruiter responses")
             
             return matches_made
             
@@ -338,8 +611,15 @@ class EmailResponseTracker:
             self.logger.error(f"Error matching responses to applications: {e}")
             return 0
     
+    def close(self):
+        """Stop the parse worker processes, if any were started"""
+        with self._parse_pool_lock:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
+                self._parse_pool = None
+    
     def check_and_update_responses(self):
-        """Main method to check for responses and update Excel"""
+        """Main method to check for responses and update the job store"""
         try:
             responses = self.check_for_responses()
             if responses:
@@ -349,3 +629,26 @@ class EmailResponseTracker:
         except Exception as e:
             self.logger.error(f"Error in check_and_update_responses: {e}")
             return 0
+
+
+# Trackers of a parse worker process, one per classifier config it has been sent
+_worker_trackers = {}
+
+
+def _worker_tracker(classifier_config):
+    key = json.dumps(classifier_config, sort_keys=True)
+    if key not in _worker_trackers:
+        _worker_trackers[key] = EmailResponseTracker.for_parsing(classifier_config)
+    return _worker_trackers[key]
+
+
+def _init_parse_worker(classifier_config):
+    # The pool owner's tracker is built up front; other profiles' on their first chunk
+    _worker_tracker(classifier_config)
+
+
+def _run_parse_chunk(method, chunk, classifier_config):
+    """Run a chunk method in a worker, returning its results and the metrics it recorded"""
+    metrics.reset()
+    results = getattr(_worker_tracker(classifier_config), method)(chunk)
+    return results, metrics.drain()
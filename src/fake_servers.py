@@ -0,0 +1,567 @@
+"""
+Local stand-ins for the job portals and the IMAP server, for offline benchmarks.
+
+PortalServer serves search result pages (recorded HTML or synthetic pages in
+the portals' markup) and FakeImapServer speaks enough IMAP4rev1 for
+EmailResponseTracker, backed by an mbox file or synthetic messages.
+"""
+
+import email
+import logging
+import mailbox
+import random
+import re
+import select
+import socket
+import socketserver
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import format_datetime, parsedate_to_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Portal -> (path served, name of the query parameter holding the keywords)
+PORTAL_ROUTES = {
+    'indeed': ('/indeed/jobs', 'q'),
+    'linkedin': ('/linkedin/jobs/search/', 'keywords')
+}
+
+TITLE_QUALIFIERS = ['', 'Junior ', 'Senior ', 'Remote ', 'Lead ', 'Mid-level ']
+
+# Page chrome around the result list, roughly the size of a real results page
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>{title}</title>
+<script>window.__config = {{{config}}};</script>
+<style>{style}</style></head>
+<body><header><nav>{nav}</nav></header>
+<main><ul class="results">
+{cards}
+</ul></main>
+<footer>{nav}</footer></body></html>
+"""
+
+INDEED_CARD = """<li><div class="job_seen_beacon cardOutline" data-jk="{job_id}">
+<h2 class="jobTitle"><a href="/indeed/viewjob?jk={job_id}" data-mobtk="{token}"><span title="{title}">{title}</span></a></h2>
+<div class="company_location"><span data-testid="company-name">{company}</span>
+<div data-testid="job-location">{location}</div></div>
+<div class="metadata"><div class="attribute_snippet">{snippet}</div></div>
+<div class="job-snippet"><ul>{bullets}</ul></div>
+<span class="date">Posted {days} days ago</span></div></li>"""
+
+LINKEDIN_CARD = """<li><div class="base-card base-search-card job-search-card" data-entity-urn="urn:li:jobPosting:{job_id}">
+<a class="base-card__full-link" href="/linkedin/jobs/view/{job_id}?trk={token}"><span class="sr-only">{title}</span></a>
+<div class="base-search-card__info"><h3 class="base-search-card__title">{title}</h3>
+<h4 class="base-search-card__subtitle"><a href="/linkedin/company/{job_id}">{company}</a></h4>
+<div class="base-search-card__metadata"><span class="job-search-card__location">{location}</span>
+<div class="job-posting-benefits">{snippet}</div><ul>{bullets}</ul>
+<time class="job-search-card__listdate">{days} days ago</time></div></div></div></li>"""
+
+
+class PortalServer:
+    """Local HTTP server standing in for the Indeed and LinkedIn search pages
+
+    Serves page N of a search from html_dir/<portal>_<N>.html when recorded
+    pages are given (the same pages for every search), otherwise synthetic
+    pages of page_size cards whose titles contain the searched keywords.
+    Searches have pages_per_search pages; later pages are empty.
+    """
+
+    def __init__(self, companies=None, pages_per_search=3, page_sizes=None, html_dir=None, latency=0.0, seed=0):
+        self.companies = list(companies or [f"Company {number}" for number in range(100)])
+        self.pages_per_search = pages_per_search
+        self.page_sizes = dict({'indeed': 10, 'linkedin': 25}, **(page_sizes or {}))
+        self.html_dir = Path(html_dir) if html_dir else None
+        self.latency = latency
+        self.seed = seed
+        self.requests = 0
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self, host='127.0.0.1', port=0):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle_get(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='portal-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_url(self, portal: str) -> str:
+        """page_url template pointing a portal's searches at this server"""
+        path, query = PORTAL_ROUTES[portal]
+        return f"{self.base_url}{path}?{query}={{keywords}}&location={{location}}&start={{start}}"
+
+    def handle_get(self, request):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+
+        parsed = urlparse(request.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        portal = next((name for name, (path, _) in PORTAL_ROUTES.items() if parsed.path == path), None)
+        if portal is None:
+            request.send_error(404)
+            return
+
+        page_size = self.page_sizes[portal]
+        page = int(params.get('start', 0)) // page_size
+        keywords = params.get(PORTAL_ROUTES[portal][1], '')
+        body = self.render_page(portal, keywords, page).encode('utf-8')
+
+        request.send_response(200)
+        request.send_header('Content-Type', 'text/html; charset=utf-8')
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def render_page(self, portal: str, keywords: str, page: int) -> str:
+        if self.html_dir is not None:
+            recorded = self.html_dir / f"{portal}_{page}.html"
+            return recorded.read_text(encoding='utf-8') if recorded.exists() else self._page(portal, keywords, [])
+        if page >= self.pages_per_search:
+            return self._page(portal, keywords, [])
+
+        # Same search and page -> same jobs, so repeated runs see known listings
+        rng = random.Random(f"{self.seed}:{portal}:{keywords}:{page}")
+        template = INDEED_CARD if portal == 'indeed' else LINKEDIN_CARD
+        page_size = self.page_sizes[portal]
+        cards = []
+        for number in range(page * page_size, (page + 1) * page_size):
+            job_id = f"{zlib.crc32(f'{portal}:{keywords}'.encode()):010d}{number:04d}"
+            title = f"{rng.choice(TITLE_QUALIFIERS)}{keywords.title()}"
+            cards.append(template.format(
+                job_id=job_id,
+                token=format(rng.getrandbits(64), 'x'),
+                title=escape(f"{title} ({rng.choice(['Remote', 'Hybrid', 'Contract', 'Full-time'])} #{number})"),
+                company=escape(rng.choice(self.companies)),
+                location='Remote',
+                snippet=escape(f"${rng.randint(60, 180)},000 a year"),
+                bullets=''.join(f"<li>Work with {escape(keywords)} tooling, item {item}</li>" for item in range(6)),
+                days=rng.randint(0, 30)
+            ))
+        return self._page(portal, keywords, cards)
+
+    def _page(self, portal, keywords, cards) -> str:
+        return PAGE_TEMPLATE.format(
+            title=escape(f"{keywords} jobs - {portal}"),
+            config=', '.join(f'"flag{number}": {number}' for number in range(200)),
+            style=' '.join(f".c{number} {{margin: {number}px}}" for number in range(300)),
+            nav=''.join(f'<a href="/{portal}/link{number}">Link {number}</a>' for number in range(60)),
+            cards='\n'.join(cards)
+        )
+
+
+def _quote(value) -> str:
+    if value is None:
+        return 'NIL'
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def body_structure(part) -> str:
+    """IMAP BODYSTRUCTURE of a message (part)"""
+    if part.is_multipart():
+        children = ''.join(body_structure(child) for child in part.get_payload())
+        return f"({children} {_quote(part.get_content_subtype().upper())})"
+
+    params = (part.get_params() or [])[1:]
+    param_list = '(' + ' '.join(f"{_quote(key.upper())} {_quote(value)}" for key, value in params) + ')' if params else 'NIL'
+    payload = _payload_bytes(part)
+    encoding = (part.get('Content-Transfer-Encoding') or '7BIT').upper()
+    fields = (
+        f"{_quote(part.get_content_maintype().upper())} {_quote(part.get_content_subtype().upper())} "
+        f"{param_list} NIL NIL {_quote(encoding)} {len(payload)}"
+    )
+    if part.get_content_maintype() == 'text':
+        lines = payload.count(b'\n')
+        fields += f" {lines}"
+    return f"({fields})"
+
+
+def _payload_bytes(part) -> bytes:
+    """Body of a part as transferred, i.e. still transfer-encoded"""
+    payload = part.get_payload(decode=False)
+    if isinstance(payload, list):
+        raw = part.as_bytes()
+        return raw.split(b'\n\n', 1)[-1]
+    return payload.encode('utf-8', errors='replace')
+
+
+class _Message:
+    def __init__(self, uid, raw: bytes):
+        self.uid = uid
+        self.raw = raw.replace(b'\r\n', b'\n')
+        self.message = email.message_from_bytes(self.raw)
+        try:
+            self.date = parsedate_to_datetime(self.message['Date']).date()
+        except (TypeError, ValueError):
+            self.date = datetime.now().date()
+        self.structure = body_structure(self.message)
+
+    def section(self, spec: str) -> bytes:
+        """Contents of BODY[spec]"""
+        head, _, body = self.raw.partition(b'\n\n')
+        upper = spec.upper()
+        if upper == '':
+            data = self.raw
+        elif upper == 'HEADER':
+            data = head + b'\n\n'
+        elif upper == 'TEXT':
+            data = body
+        elif upper.startswith('HEADER.FIELDS'):
+            wanted = {name.encode().lower() for name in re.findall(r'[\w-]+', upper[len('HEADER.FIELDS'):])}
+            lines = []
+            keep = False
+            for line in head.split(b'\n'):
+                if line[:1] in (b' ', b'\t'):
+                    if keep:
+                        lines.append(line)
+                    continue
+                keep = line.split(b':', 1)[0].strip().lower() in wanted
+                if keep:
+                    lines.append(line)
+            data = b'\n'.join(lines) + b'\n\n'
+        else:
+            part = self.message
+            for number in spec.split('.'):
+                if part.is_multipart():
+                    part = part.get_payload()[int(number) - 1]
+                elif number != '1':
+                    return b''
+            data = _payload_bytes(part)
+        return data.replace(b'\n', b'\r\n')
+
+
+class FakeImapServer:
+    """Minimal IMAP4rev1 server over plain TCP, serving one mailbox
+
+    Supports CAPABILITY, LOGIN, SELECT/EXAMINE, STATUS, UID SEARCH (ALL,
+    SINCE, UID <set>), UID FETCH (UID, FLAGS, RFC822.SIZE, BODYSTRUCTURE,
+    BODY[...] / BODY.PEEK[...]), IDLE, NOOP, CLOSE and LOGOUT. Any login is
+    accepted. latency adds a delay per command to mimic a remote server.
+    Clients in IDLE are sent "* n EXISTS" when add_message delivers mail.
+    """
+
+    def __init__(self, messages: List[bytes] = (), uidvalidity=1, latency=0.0):
+        self.uidvalidity = uidvalidity
+        self.latency = latency
+        self.commands = 0
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._messages: List[_Message] = []
+        self._connections = set()
+        self._server = None
+        for raw in messages:
+            self.add_message(raw)
+
+    @classmethod
+    def from_mbox(cls, path, **kwargs) -> 'FakeImapServer':
+        return cls([message.as_bytes() for message in mailbox.mbox(path)], **kwargs)
+
+    def add_message(self, raw: bytes) -> int:
+        """Deliver a message to the mailbox and return its UID"""
+        with self._lock:
+            uid = self._messages[-1].uid + 1 if self._messages else 1
+            self._messages.append(_Message(uid, raw))
+            return uid
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self, host='127.0.0.1', port=0):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            # Responses are buffered and flushed once per command
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def handle(self):
+                server.handle_connection(self.rfile, self.wfile, self.connection)
+
+            def finish(self):
+                # The client may be gone already (drop_connections)
+                try:
+                    super().finish()
+                except OSError:
+                    pass
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='imap-server', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def drop_connections(self) -> int:
+        """Cut every client connection, like a server restart or a network failure"""
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return len(connections)
+
+    @property
+    def address(self):
+        return self._server.server_address[:2]
+
+    def handle_connection(self, rfile, wfile, connection=None):
+        if connection is not None:
+            with self._lock:
+                self._connections.add(connection)
+        try:
+            self._serve(rfile, wfile, connection)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._connections.discard(connection)
+
+    def _idle(self, rfile, wfile, connection, exists) -> bool:
+        """Report new messages until the client sends DONE; False if it hung up"""
+        wfile.write(b'+ idling\r\n')
+        wfile.flush()
+        while True:
+            with self._lock:
+                count = len(self._messages)
+            if count > exists:
+                exists = count
+                wfile.write(f'* {exists} EXISTS\r\n'.encode())
+                wfile.flush()
+            if connection is not None and not select.select([connection], [], [], 0.02)[0]:
+                continue
+            line = rfile.readline()
+            if not line:
+                return False
+            if line.strip().upper() == b'DONE':
+                return True
+
+    def _serve(self, rfile, wfile, connection):
+        def send(line):
+            wfile.write((line if isinstance(line, bytes) else line.encode()) + b'\r\n')
+
+        send('* OK [CAPABILITY IMAP4rev1 IDLE] Fake IMAP server ready')
+        with self._lock:
+            exists = len(self._messages)
+        while True:
+            wfile.flush()
+            line = rfile.readline()
+            if not line:
+                return
+            parts = line.decode('utf-8', errors='replace').rstrip('\r\n').split(' ', 2)
+            if len(parts) < 2:
+                send('* BAD Missing command')
+                continue
+            tag, command, args = parts[0], parts[1].upper(), parts[2] if len(parts) > 2 else ''
+            if self.latency:
+                time.sleep(self.latency)
+            with self._lock:
+                self.commands += 1
+
+            try:
+                if command == 'UID':
+                    subcommand, _, args = args.partition(' ')
+                    if subcommand.upper() == 'SEARCH':
+                        send('* SEARCH ' + ' '.join(str(uid) for uid in self.search(args)))
+                    elif subcommand.upper() == 'FETCH':
+                        uid_set, _, items = args.partition(' ')
+                        for response in self.fetch(uid_set, items):
+                            wfile.write(response)
+                    else:
+                        send(f'{tag} BAD Unsupported UID command')
+                        continue
+                elif command == 'CAPABILITY':
+                    send('* CAPABILITY IMAP4rev1 IDLE')
+                elif command == 'IDLE':
+                    if not self._idle(rfile, wfile, connection, exists):
+                        return
+                    with self._lock:
+                        exists = len(self._messages)
+                elif command in ('SELECT', 'EXAMINE'):
+                    with self._lock:
+                        exists = len(self._messages)
+                        uidnext = self._messages[-1].uid + 1 if self._messages else 1
+                    send(f'* {exists} EXISTS')
+                    send('* 0 RECENT')
+                    send(f'* OK [UIDVALIDITY {self.uidvalidity}] UIDs valid')
+                    send(f'* OK [UIDNEXT {uidnext}] Predicted next UID')
+                    send('* FLAGS (\\Seen \\Answered \\Flagged \\Deleted \\Draft)')
+                elif command == 'STATUS':
+                    name = args.split(' ', 1)[0]
+                    with self._lock:
+                        uidnext = self._messages[-1].uid + 1 if self._messages else 1
+                        send(f'* STATUS {name} (MESSAGES {len(self._messages)} UIDVALIDITY {self.uidvalidity} UIDNEXT {uidnext})')
+                elif command == 'LOGOUT':
+                    send('* BYE Logging out')
+                    send(f'{tag} OK LOGOUT completed')
+                    wfile.flush()
+                    return
+                elif command not in ('LOGIN', 'NOOP', 'CLOSE'):
+                    send(f'{tag} BAD Unsupported command {command}')
+                    continue
+            except OSError:
+                # The client hung up (handled by handle_connection)
+                raise
+            except Exception as e:
+                self.logger.warning(f"Fake IMAP server failed on {command}: {e}")
+                send(f'{tag} BAD {e}')
+                continue
+
+            send(f'{tag} OK [READ-WRITE] SELECT completed' if command == 'SELECT' else f'{tag} OK {command} completed')
+
+    def _uids(self, uid_set: str) -> List[int]:
+        with self._lock:
+            messages = {message.uid for message in self._messages}
+            highest = max(messages, default=0)
+        wanted = set()
+        for item in uid_set.split(','):
+            first, _, last = item.partition(':')
+            first = highest if first == '*' else int(first)
+            last = first if not last else (highest if last == '*' else int(last))
+            wanted.update(range(min(first, last), max(first, last) + 1))
+        return sorted(wanted & messages)
+
+    def search(self, criteria: str) -> List[int]:
+        """UIDs matching ALL / SINCE <date> / UID <set> criteria (combined with AND)"""
+        with self._lock:
+            matched = {message.uid: message for message in self._messages}
+        tokens = criteria.split()
+        while tokens:
+            key = tokens.pop(0).upper()
+            if key == 'ALL':
+                continue
+            if key == 'SINCE':
+                since = datetime.strptime(tokens.pop(0), '%d-%b-%Y').date()
+                matched = {uid: message for uid, message in matched.items() if message.date >= since}
+            elif key == 'UID':
+                wanted = set(self._uids(tokens.pop(0)))
+                matched = {uid: message for uid, message in matched.items() if uid in wanted}
+            else:
+                raise ValueError(f"unsupported search key {key}")
+        return sorted(matched)
+
+    def fetch(self, uid_set: str, items: str):
+        """Untagged FETCH responses (bytes) for the messages of a UID set"""
+        requested = re.findall(r'BODY(?:\.PEEK)?\[[^\]]*\]|[A-Z0-9.]+', items.upper().strip('()'))
+        sections = re.findall(r'BODY(?:\.PEEK)?\[([^\]]*)\]', items, re.IGNORECASE)
+        with self._lock:
+            by_uid = {message.uid: (number, message) for number, message in enumerate(self._messages, 1)}
+
+        for uid in self._uids(uid_set):
+            number, message = by_uid[uid]
+            response = f'* {number} FETCH (UID {uid}'.encode()
+            section_values = iter(sections)
+            for item in requested:
+                if item == 'UID':
+                    continue
+                if item == 'FLAGS':
+                    response += b' FLAGS ()'
+                elif item == 'RFC822.SIZE':
+                    response += f' RFC822.SIZE {len(message.raw)}'.encode()
+                elif item == 'BODYSTRUCTURE':
+                    response += b' BODYSTRUCTURE ' + message.structure.encode()
+                elif item.startswith('BODY'):
+                    spec = next(section_values)
+                    data = message.section(spec)
+                    response += f' BODY[{spec}] {{{len(data)}}}\r\n'.encode() + data
+            yield response + b')\r\n'
+
+
+def synthetic_mailbox(count: int, companies: List[str], days=5, seed=0, now: Optional[datetime] = None) -> List[bytes]:
+    """Raw messages: recruiter replies from the given companies mixed with newsletters and personal mail
+
+    Dates are spread over the last `days` days; a third of the recruiter
+    replies are multipart/alternative and some are base64 encoded.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    replies = [
+        ("Your application for {title} at {company}",
+         "Thank you for applying. Unfortunately we have decided to go with other candidates for the {title} role."),
+        ("Interview invitation - {title}",
+         "We were impressed by your background and would like to schedule an interview for the {title} position. "
+         "Are you available for a Zoom call next week?"),
+        ("Update on your application",
+         "Thanks for your interest in the {title} opportunity. We are reviewing your resume and will be in touch.")
+    ]
+    other = [
+        ("news@deals-weekly.com", "Weekly deals and promotions", "Huge sale this week only! Click to unsubscribe."),
+        ("friend@gmail.com", "Dinner on Friday?", "Are we still on for dinner on Friday? Let me know."),
+        ("alerts@bank-example.com", "Your monthly statement", "Your statement is ready to view online.")
+    ]
+
+    messages = []
+    for number in range(count):
+        date = now - timedelta(seconds=rng.randint(0, days * 86400 - 3600))
+        if rng.random() < 0.4:
+            company = rng.choice(companies)
+            domain = re.sub(r'[^a-z0-9]+', '-', company.lower()).strip('-') + '.com'
+            title = rng.choice(['Python Developer', 'Software Engineer', 'Data Scientist', 'Backend Developer'])
+            subject, text = rng.choice(replies)
+            subject, text = subject.format(title=title, company=company), text.format(title=title)
+            body = f"Hello,\n\n{text}\n\nBest regards,\nJordan Smith\n{company}\n"
+            sender = f"{company} Recruiting <careers@{domain}>"
+            charset = 'utf-8' if rng.random() < 0.3 else 'us-ascii'
+            if rng.random() < 0.33:
+                message = MIMEMultipart('alternative')
+                message.attach(MIMEText(body, 'plain', charset))
+                message.attach(MIMEText(f"<html><body><p>{escape(text)}</p><p>{escape(company)}</p></body></html>", 'html', charset))
+            else:
+                message = MIMEText(body, 'plain', charset)
+        else:
+            sender, subject, text = rng.choice(other)
+            message = MIMEText(f"{text}\n\n" + "Lorem ipsum dolor sit amet. " * rng.randint(5, 40), 'plain', 'us-ascii')
+
+        message['From'] = sender
+        message['To'] = 'me@example.com'
+        message['Subject'] = subject
+        message['Date'] = format_datetime(date.astimezone())
+        message['Message-ID'] = f"<{number}.{seed}@example.com>"
+        messages.append(message.as_bytes())
+    return messages
@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+from src.metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    etag TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    fetched_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL,
+    parse_key TEXT NOT NULL DEFAULT '',
+    parsed TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_pages_last_used ON pages (last_used);
+"""
+
+
+class FetchCache:
+    """On-disk cache of fetched pages keyed by URL
+
+    Keeps the (compressed) body, the validators needed for conditional GETs
+    (ETag / Last-Modified) and the job cards parsed from the body, so a page
+    that did not change is neither downloaded nor parsed again. Entries
+    younger than ttl seconds are served without contacting the server; the
+    least recently used entries are evicted once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, db_path, ttl=6 * 3600, max_bytes=50 * 1024 * 1024):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        # Scraper threads share the connection, so serialize access ourselves
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            self.conn.commit()
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Start counting lookups for a new run"""
+        self.stats = {'fresh': 0, 'revalidated': 0, 'fetched': 0, 'missing': 0}
+
+    def record(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+        metrics.count(f"http_cache_{outcome}")
+
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache (fresh or confirmed by a 304)"""
+        lookups = sum(self.stats.values())
+        return (self.stats['fresh'] + self.stats['revalidated']) / lookups if lookups else 0.0
+
+    def get(self, url) -> Optional[Dict]:
+        """Cached entry for a URL with its decompressed body and an 'age' in seconds"""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            self.conn.execute("UPDATE pages SET last_used = ? WHERE url = ?", (now, url))
+            self.conn.commit()
+        entry = dict(row)
+        entry['body'] = zlib.decompress(row['body']).decode('utf-8')
+        entry['age'] = now - row['fetched_at']
+        return entry
+
+    def is_fresh(self, entry) -> bool:
+        return entry['age'] < self.ttl
+
+    def put(self, url, body: str, etag='', last_modified=''):
+        """Store a freshly downloaded page (dropping any parse of the old body)"""
+        data = zlib.compress(body.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, fetched_at, last_used, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, data, etag or '', last_modified or '', now, now, len(data))
+            )
+            self._evict()
+            self.conn.commit()
+
+    def touch(self, url):
+        """Mark an entry as confirmed unchanged by the server"""
+        with self._lock:
+            self.conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+    def get_parsed(self, entry, parse_key):
+        """Parse result stored for this entry's body, if it was parsed the same way"""
+        if entry['parse_key'] == parse_key and entry['parsed']:
+            return json.loads(entry['parsed'])
+        return None
+
+    def put_parsed(self, url, parse_key, parsed):
+        with self._lock:
+            self.conn.execute(
+                "UPDATE pages SET parse_key = ?, parsed = ? WHERE url = ?",
+                (parse_key, json.dumps(parsed), url)
+            )
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used pages until the cache fits in max_bytes"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for row in self.conn.execute("SELECT url, size FROM pages ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM pages WHERE url = ?", (row['url'],))
+            total -= row['size']
+            evicted += 1
+        self.logger.info(f"Evicted {evicted} pages from the fetch cache")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
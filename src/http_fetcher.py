@@ -0,0 +1,132 @@
+import hashlib
+import json
+import logging
+from typing import Dict, List, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.metrics import metrics
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode for a page that is not in the fetch cache"""
+
+
+class HttpFetcher:
+    """Fetch search pages over plain HTTP and parse job cards with lxml"""
+
+    def __init__(self, pool_size=4, timeout=10, cache=None, offline=False):
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+
+        # Optional FetchCache; offline replays cached pages without any network access
+        self.cache = cache
+        self.offline = offline
+
+        # One session keeps connections to each portal alive between searches
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml',
+            'Accept-Language': 'en-US,en;q=0.9'
+        })
+        retries = Retry(total=2, backoff_factor=1, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, url: str, timeout=None) -> str:
+        """GET a page and return its HTML, raising on HTTP errors"""
+        with metrics.timer('http_get'):
+            response = self.session.get(url, timeout=timeout or self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def fetch_cards(self, url: str, selectors: Dict[str, str], limit: int, timeout=None) -> Tuple[int, List[Dict]]:
+        """Fetch a search page and parse its job cards, going through the cache if there is one
+
+        A fresh cached page is used as is; a stale one is revalidated with a
+        conditional GET. Either way an unchanged page reuses its stored parse.
+        """
+        if self.cache is None:
+            return self.parse_cards(self.fetch(url, timeout), selectors, limit)
+
+        parse_key = hashlib.sha1(json.dumps([selectors, limit], sort_keys=True).encode()).hexdigest()
+        entry = self.cache.get(url)
+
+        if entry is not None and (self.offline or self.cache.is_fresh(entry)):
+            self.cache.record('fresh')
+            return self._cached_parse(url, entry, parse_key, selectors, limit)
+        if self.offline:
+            self.cache.record('missing')
+            raise OfflineCacheMiss(f"{url} is not in the fetch cache")
+
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        with metrics.timer('http_get'):
+            response = self.session.get(url, timeout=timeout or self.timeout, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(url)
+            self.cache.record('revalidated')
+            return self._cached_parse(url, entry, parse_key, selectors, limit)
+        response.raise_for_status()
+
+        self.cache.record('fetched')
+        self.cache.put(url, response.text, response.headers.get('ETag', ''), response.headers.get('Last-Modified', ''))
+        result = self.parse_cards(response.text, selectors, limit)
+        self.cache.put_parsed(url, parse_key, result)
+        return result
+
+    def _cached_parse(self, url, entry, parse_key, selectors, limit) -> Tuple[int, List[Dict]]:
+        parsed = self.cache.get_parsed(entry, parse_key)
+        if parsed is not None:
+            total, cards = parsed
+            return total, cards
+        result = self.parse_cards(entry['body'], selectors, limit)
+        self.cache.put_parsed(url, parse_key, result)
+        return result
+
+    @metrics.timed('html_parsing')
+    def parse_cards(self, html: str, selectors: Dict[str, str], limit: int) -> Tuple[int, List[Dict]]:
+        """Parse job cards out of static HTML
+
+        Mirrors JobTrackingAgent.extract_job_cards: returns the total number of
+        cards and one dict per card, with an 'error' key for unreadable cards.
+        """
+        soup = BeautifulSoup(html, 'lxml')
+        job_cards = soup.select(selectors['job_card'])
+
+        cards = []
+        for card in job_cards[:limit]:
+            try:
+                cards.append({
+                    'title': self._select_one(card, selectors, 'title').get_text(' ', strip=True),
+                    'company': self._select_one(card, selectors, 'company').get_text(' ', strip=True),
+                    'link': self._select_one(card, selectors, 'link').get('href', '')
+                })
+            except Exception as e:
+                cards.append({'error': str(e)})
+
+        return len(job_cards), cards
+
+    def _select_one(self, card, selectors, name):
+        element = card.select_one(selectors[name])
+        if element is None:
+            raise ValueError(f"no element matching {selectors[name]} for {name}")
+        return element
+
+    def close(self):
+        """Close pooled connections (and the cache)"""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,144 @@
+"""
+Helpers for bulk IMAP FETCH: UID sets, response parsing and BODYSTRUCTURE walking.
+"""
+
+import base64
+import quopri
+import re
+from typing import Dict, List, Optional, Tuple
+
+_LITERAL_MARKER = re.compile(rb'\{\d+\}$')
+
+
+def compress_uid_set(uids) -> str:
+    """Turn UIDs into an IMAP sequence set, e.g. [1, 2, 3, 7] -> '1:3,7'"""
+    ranges = []
+    for uid in sorted(set(uids)):
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ','.join(str(a) if a == b else f"{a}:{b}" for a, b in ranges)
+
+
+def _lex(text: bytes):
+    """Tokens of an IMAP response line: '(' / ')', quoted strings, NIL and atoms"""
+    i = 0
+    while i < len(text):
+        char = text[i:i + 1]
+        if char in (b' ', b'\r', b'\n'):
+            i += 1
+        elif char in (b'(', b')'):
+            yield char.decode()
+            i += 1
+        elif char == b'"':
+            i += 1
+            value = bytearray()
+            while i < len(text) and text[i:i + 1] != b'"':
+                if text[i:i + 1] == b'\\':
+                    i += 1
+                value += text[i:i + 1]
+                i += 1
+            i += 1
+            yield bytes(value)
+        else:
+            start = i
+            while i < len(text) and text[i:i + 1] not in (b' ', b'(', b')', b'"', b'\r', b'\n'):
+                # Section specs like BODY[HEADER.FIELDS (FROM)] keep their spaces and parens
+                if text[i:i + 1] == b'[':
+                    i = text.index(b']', i)
+                i += 1
+            atom = text[start:i]
+            yield None if atom.upper() == b'NIL' else atom
+
+
+def _tokens(data):
+    """Flatten imaplib's mix of lines and (line, literal) tuples into tokens"""
+    for item in data:
+        if isinstance(item, tuple):
+            head, literal = item
+            yield from _lex(_LITERAL_MARKER.sub(b'', head.rstrip()))
+            yield literal
+        elif item:
+            yield from _lex(item)
+
+
+def _parse_list(tokens):
+    values = []
+    for token in tokens:
+        if token == '(':
+            values.append(_parse_list(tokens))
+        elif token == ')':
+            return values
+        else:
+            values.append(token)
+    return values
+
+
+def parse_fetch_response(data) -> Dict[int, Dict[str, object]]:
+    """Map UID -> {item name: value} for a UID FETCH response
+
+    Item names are upper-cased strings such as 'BODYSTRUCTURE' or
+    'BODY[HEADER.FIELDS (FROM SUBJECT DATE)]'; lists are nested Python lists.
+    """
+    messages = {}
+    tokens = _tokens(data)
+    for token in tokens:
+        if token != '(':
+            # Message sequence number preceding the item list
+            continue
+        items = _parse_list(tokens)
+        fields = {}
+        for key, value in zip(items[0::2], items[1::2]):
+            if isinstance(key, bytes):
+                fields[key.decode('ascii', errors='replace').upper()] = value
+        if 'UID' in fields:
+            messages[int(fields['UID'])] = fields
+    return messages
+
+
+def _text(value) -> str:
+    return value.decode('ascii', errors='replace').lower() if isinstance(value, bytes) else ''
+
+
+def text_plain_sections(structure) -> List[Tuple[str, str, Optional[str]]]:
+    """(section, transfer encoding, charset) for every text/plain part of a BODYSTRUCTURE"""
+    sections = []
+
+    def walk(body, section):
+        if body and isinstance(body[0], list):
+            children = []
+            for child in body:
+                if not isinstance(child, list):
+                    break
+                children.append(child)
+            for number, child in enumerate(children, 1):
+                walk(child, f"{section}.{number}" if section else str(number))
+            return
+
+        part = section or '1'
+        media_type = (_text(body[0]), _text(body[1]))
+        if media_type == ('text', 'plain'):
+            params = body[2] if isinstance(body[2], list) else []
+            charset = dict(zip(map(_text, params[0::2]), map(_text, params[1::2]))).get('charset')
+            sections.append((part, _text(body[5]), charset or None))
+        elif media_type == ('message', 'rfc822') and len(body) > 8 and isinstance(body[8], list):
+            inner = body[8]
+            walk(inner, part if inner and isinstance(inner[0], list) else f"{part}.1")
+
+    if isinstance(structure, list) and structure:
+        walk(structure, '')
+    return sections
+
+
+def decode_part(payload: bytes, encoding: str, charset: Optional[str]) -> str:
+    """Undo the transfer encoding of a body part and decode it to text"""
+    if encoding == 'base64':
+        payload = base64.b64decode(payload)
+    elif encoding == 'quoted-printable':
+        payload = quopri.decodestring(payload)
+
+    try:
+        return payload.decode(charset or 'utf-8', errors='ignore')
+    except LookupError:
+        return payload.decode('utf-8', errors='ignore')
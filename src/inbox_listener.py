@@ -0,0 +1,169 @@
+"""
+IMAP IDLE listener: waits on one idle connection and matches new recruiter
+responses as soon as they arrive, instead of at the next scheduled check.
+"""
+
+import imaplib
+import itertools
+import logging
+import re
+import select
+import ssl
+import threading
+import time
+from typing import Callable, Optional
+
+from src.metrics import metrics
+
+_EXISTS = re.compile(rb'\* \d+ EXISTS')
+
+
+class InboxListener:
+    """Long-running IMAP IDLE listener for one EmailResponseTracker
+
+    Holds a single connection from connect_to_email in IDLE. When the server
+    reports new mail, it leaves IDLE, fetches and classifies only what
+    arrived since the last sync (fetch_new_responses), matches it to
+    applications and idles again. IDLE is renewed every idle_keepalive_seconds
+    (servers drop clients idle for 30 minutes); a lost connection is
+    reopened with exponential backoff, and the catch-up sync on reconnect
+    picks up mail that arrived meanwhile. imaplib has no IDLE support, so
+    the command is spoken directly on the connection.
+    """
+
+    def __init__(self, tracker, on_match: Optional[Callable[[int], None]] = None):
+        self.tracker = tracker
+        self.on_match = on_match
+        self.logger = logging.getLogger(__name__)
+        email_config = tracker.email_config
+        self.mailbox = email_config.get('mailbox', 'inbox')
+        self.keepalive = email_config.get('idle_keepalive_seconds', 25 * 60)
+        self.backoff_initial = email_config.get('idle_backoff_seconds', 5)
+        self.backoff_max = email_config.get('idle_backoff_max_seconds', 300)
+        self.reconnects = 0
+        self._stop = threading.Event()
+        self._tags = itertools.count(1)
+
+    def run(self):
+        """Listen until stop() is called (blocks the calling thread); returns at once without email credentials"""
+        if not self.tracker.is_configured():
+            self.logger.warning("Email not configured, not listening for new mail")
+            return
+        delay = self.backoff_initial
+        while not self._stop.is_set():
+            mail = self.tracker.connect_to_email()
+            if mail is not None:
+                try:
+                    mail.select(self.mailbox)
+                    delay = self.backoff_initial
+                    self.logger.info(f"Listening for new mail in {self.mailbox}")
+                    # Catch up on mail that arrived while not connected
+                    self.sync(mail)
+                    while not self._stop.is_set():
+                        if self.idle(mail):
+                            self.sync(mail)
+                except (imaplib.IMAP4.error, OSError) as e:
+                    self.logger.warning(f"IMAP IDLE connection lost: {e}")
+                except Exception:
+                    # A failed sync must not end the listener; reconnect and catch up instead
+                    self.logger.exception("IMAP IDLE listener failed")
+                finally:
+                    self._logout(mail)
+
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            metrics.count('imap_idle_reconnects')
+            self.logger.info(f"Reconnecting to the mail server in {delay:.0f}s")
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.backoff_max)
+
+    def stop(self):
+        """Leave IDLE and stop listening (within about a second)"""
+        self._stop.set()
+
+    def sync(self, mail) -> int:
+        """Fetch, classify and match the mail that arrived since the last sync"""
+        with metrics.timer('imap_idle_sync'):
+            responses = self.tracker.fetch_new_responses(mail)
+            # A backlog over max_messages_per_run takes several rounds; stop at a failed fetch, retried next sync
+            stats = self.tracker.last_fetch_stats
+            while stats['deferred'] and not stats['failed'] and not self._stop.is_set():
+                responses += self.tracker.fetch_new_responses(mail)
+                stats = self.tracker.last_fetch_stats
+            # EXISTS responses collected by imaplib during the sync are not needed
+            mail.response('EXISTS')
+            matched = self.tracker.match_responses_to_applications(responses) if responses else 0
+        if matched:
+            self.logger.info(f"Matched {matched} new responses as they arrived")
+            if self.on_match:
+                self.on_match(matched)
+        return matched
+
+    def idle(self, mail) -> bool:
+        """One IDLE round: True once the server reports new mail, False when it is time to renew"""
+        tag = self._new_tag()
+        mail.send(f"{tag} IDLE\r\n".encode())
+        line = mail.readline()
+        if not line.startswith(b'+'):
+            raise imaplib.IMAP4.error(f"Server refused IDLE: {line.strip()!r}")
+
+        new_mail = False
+        deadline = time.monotonic() + self.keepalive
+        while not new_mail and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Short waits so stop() is noticed promptly
+            if self._readable(mail, min(remaining, 1.0)):
+                new_mail = self._read_idle_line(mail)
+
+        mail.send(b"DONE\r\n")
+        while True:
+            line = mail.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("connection closed while ending IDLE")
+            if line.startswith(tag.encode()):
+                if not line[len(tag):].lstrip().startswith(b'OK'):
+                    raise imaplib.IMAP4.error(f"IDLE failed: {line.strip()!r}")
+                break
+            new_mail = self._read_idle_line(mail, line) or new_mail
+
+        if new_mail:
+            metrics.count('imap_idle_notifications')
+        return new_mail
+
+    def _new_tag(self) -> str:
+        """Tag for an IDLE command; its own prefix keeps it apart from imaplib's tags"""
+        return f"IDLE{next(self._tags)}"
+
+    def _read_idle_line(self, mail, line=None) -> bool:
+        """Whether a server line received in IDLE announces new mail"""
+        line = line if line is not None else mail.readline()
+        if not line or line.startswith(b'* BYE'):
+            raise imaplib.IMAP4.abort(f"server closed the connection: {line.strip()!r}")
+        return bool(_EXISTS.match(line))
+
+    @staticmethod
+    def _readable(mail, timeout) -> bool:
+        """Wait for a server line, counting data imaplib or TLS already buffered"""
+        sock = mail.sock
+        if isinstance(sock, ssl.SSLSocket) and sock.pending():
+            return True
+        # peek() on a non-blocking socket returns buffered bytes without waiting
+        previous = sock.gettimeout()
+        sock.setblocking(False)
+        try:
+            if mail.file.peek(1):
+                return True
+        except (BlockingIOError, ssl.SSLWantReadError):
+            pass
+        finally:
+            sock.settimeout(previous)
+        return bool(select.select([sock], [], [], timeout)[0])
+
+    def _logout(self, mail):
+        try:
+            mail.logout()
+        except Exception:
+            pass
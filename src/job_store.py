@@ -0,0 +1,527 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import pandas as pd
+
+from src.metrics import metrics
+
+# Workbook column -> SQLite column
+EXCEL_COLUMNS = {
+    'Date_Found': 'date_found',
+    'Title': 'title',
+    'Company': 'company',
+    'Location': 'location',
+    'Website_Link': 'website_link',
+    'Portal': 'portal',
+    'Status': 'status',
+    'Date_Applied': 'date_applied',
+    'Recruiter_Response': 'recruiter_response',
+    'Response_Date': 'response_date',
+    'Notes': 'notes'
+}
+
+# Columns users edit by hand in the workbook and that are synced back
+USER_EDITABLE_COLUMNS = ['Status', 'Date_Applied', 'Notes']
+
+# Workbook column holding the store id, so edited rows are synced back by id
+ID_COLUMN = 'Job_ID'
+
+# Stored as YYYY-MM-DD text, loaded as datetime64 (NaT when empty)
+DATE_COLUMNS = ['Date_Found', 'Date_Applied', 'Response_Date']
+
+# Loaded as categoricals; values outside these lists are kept as extra categories
+CATEGORY_COLUMNS = {
+    'Status': ['Found', 'Applied', 'Interview', 'Rejected'],
+    'Portal': ['Indeed', 'LinkedIn'],
+    'Recruiter_Response': ['Auto-Reply', 'Rejection', 'Interview Request', 'Interested', 'Other']
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date_found TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    company TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    website_link TEXT NOT NULL DEFAULT '',
+    portal TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    date_applied TEXT NOT NULL DEFAULT '',
+    recruiter_response TEXT NOT NULL DEFAULT '',
+    response_date TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    norm_title TEXT NOT NULL DEFAULT '',
+    norm_company TEXT NOT NULL DEFAULT '',
+    norm_link TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs (norm_title, norm_company);
+CREATE INDEX IF NOT EXISTS idx_jobs_link ON jobs (norm_link);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE TABLE IF NOT EXISTS application_tokens (
+    token TEXT NOT NULL,
+    job_id INTEGER NOT NULL,
+    PRIMARY KEY (token, job_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_application_tokens_job ON application_tokens (job_id);
+CREATE TABLE IF NOT EXISTS workbook_rows (
+    job_id INTEGER PRIMARY KEY,
+    row_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# Legal-form suffixes dropped from company names, so "Acme Inc." == "ACME"
+COMPANY_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'llp', 'ltd', 'limited', 'corp', 'corporation',
+    'co', 'company', 'plc', 'gmbh', 'ag', 'sa', 'bv', 'pvt', 'pty', 'private'
+}
+
+# Query parameters portals add for tracking; they do not identify the job
+TRACKING_PARAMS = {'refid', 'trackingid', 'position', 'pagenum', 'from', 'tk', 'vjs'}
+
+SCHEMA_VERSION = 1
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def normalize_text(value) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = str(value).lower().replace('&', ' and ')
+    return ' '.join(_NON_ALNUM.sub(' ', text).split())
+
+
+def canonical_company(value) -> str:
+    """Normalized company name without legal-form suffixes or a leading 'the'"""
+    words = normalize_text(value).split()
+    if words and words[0] == 'the' and len(words) > 1:
+        words = words[1:]
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+def canonical_link(value) -> str:
+    """Job URL without scheme, www., fragment, trailing slash or tracking parameters"""
+    url = str(value).strip()
+    if not url:
+        return ''
+    parts = urlsplit(url if '://' in url else f'//{url}')
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = [
+        (key, val) for key, val in parse_qsl(parts.query)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')
+    ]
+    link = f"{host}{parts.path.rstrip('/')}"
+    return f"{link}?{urlencode(sorted(query))}" if query else link
+
+
+def job_key(title, company) -> Tuple[str, str]:
+    """Canonical (title, company) key used for duplicate detection"""
+    return normalize_text(title), canonical_company(company)
+
+
+def company_tokens(company) -> Set[str]:
+    """Tokens under which an application is indexed for response matching
+
+    The words of the company name plus the name with spaces and punctuation
+    removed, which is how companies usually appear in email domains
+    ("Acme Robotics Ltd" -> acme, robotics, acmerobotics, acmeroboticsltd).
+    """
+    words = normalize_text(company).split()
+    tokens = {word for word in words if len(word) > 1 and word not in COMPANY_SUFFIXES and word not in ('the', 'and')}
+    for name in (''.join(words), canonical_company(company).replace(' ', '')):
+        if len(name) > 1:
+            tokens.add(name)
+    return tokens
+
+
+def clean_cell(value) -> str:
+    """Turn a workbook cell (NaN, Timestamp, number, str) into stored text"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    return str(value)
+
+
+def clean_date(value) -> str:
+    """Turn a workbook date cell into YYYY-MM-DD text (text that is not a date is kept as is)"""
+    text = clean_cell(value)
+    if not text or _ISO_DATE.match(text):
+        return text[:10]
+    try:
+        return pd.to_datetime(text).strftime('%Y-%m-%d')
+    except (ValueError, OverflowError):
+        return text
+
+
+def row_hash(row) -> str:
+    """Hash of a workbook row's user-editable cells, to tell which rows were edited by hand"""
+    values = [(clean_date if column in DATE_COLUMNS else clean_cell)(row.get(column)) for column in USER_EDITABLE_COLUMNS]
+    return hashlib.sha1('\x1f'.join(values).encode()).hexdigest()[:16]
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def typed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the fixed workbook schema: datetime64 date columns and categorical status columns"""
+    for column in DATE_COLUMNS:
+        df[column] = pd.to_datetime(df[column].where(df[column] != ''), format='%Y-%m-%d', errors='coerce')
+    for column, categories in CATEGORY_COLUMNS.items():
+        values = df[column].where(df[column] != '')
+        extra = sorted(set(values.dropna()) - set(categories))
+        df[column] = pd.Categorical(values, categories=categories + extra)
+    return df
+
+
+class JobStore:
+    """Indexed SQLite store for tracked jobs
+
+    The store is the source of truth for a run; the Excel workbook is an
+    export of it that users edit by hand (see sync_from_excel). Jobs are
+    loaded as DataFrames with a fixed schema (see typed_frame).
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        # Scraper threads share the connection, so serialize access ourselves
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            self._migrate()
+            self.conn.commit()
+        
+        # Canonical key -> id maps, loaded on first use and kept current by add_job
+        self._keys = None
+        self._links = None
+
+        # Set whenever rows change, so the workbook is only exported when needed
+        self.dirty = False
+
+        # What the last sync_from_excel pulled in: counts and the ids moved to Applied
+        self.last_sync = {'added': 0, 'edited': 0, 'applied': []}
+
+    def _migrate(self):
+        """Bring an older database up to SCHEMA_VERSION
+
+        Version 1 is SCHEMA as it stands; a fresh database (version 0) has
+        just been created from it. Later schema changes add their steps
+        here, each guarded by `if version < N`.
+        """
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _load_keys(self):
+        """Build the in-memory duplicate index once per store"""
+        if self._keys is not None:
+            return
+        self._keys = {}
+        self._links = {}
+        for row in self.conn.execute("SELECT id, norm_title, norm_company, norm_link FROM jobs ORDER BY id"):
+            self._keys.setdefault((row['norm_title'], row['norm_company']), row['id'])
+            if row['norm_link']:
+                self._links.setdefault(row['norm_link'], row['id'])
+
+    def count(self) -> int:
+        """Number of tracked jobs"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def find_job(self, title, company, link='') -> Optional[int]:
+        """Return the id of the tracked job with this canonical title/company or link"""
+        with self._lock:
+            self._load_keys()
+            job_id = self._keys.get(job_key(title, company))
+            if job_id is None and link:
+                job_id = self._links.get(canonical_link(link))
+        return job_id
+
+    def add_job(self, job: Dict[str, str]) -> int:
+        """Insert one row given workbook-style column names and return its id"""
+        values = {
+            column: (clean_date if excel_column in DATE_COLUMNS else clean_cell)(job.get(excel_column, ''))
+            for excel_column, column in EXCEL_COLUMNS.items()
+        }
+        values['norm_title'], values['norm_company'] = job_key(values['title'], values['company'])
+        values['norm_link'] = canonical_link(values['website_link'])
+
+        columns = ', '.join(values)
+        placeholders = ', '.join('?' for _ in values)
+        with self._lock:
+            self._load_keys()
+            cursor = self.conn.execute(
+                f"INSERT INTO jobs ({columns}) VALUES ({placeholders})",
+                list(values.values())
+            )
+            self._keys.setdefault((values['norm_title'], values['norm_company']), cursor.lastrowid)
+            if values['norm_link']:
+                self._links.setdefault(values['norm_link'], cursor.lastrowid)
+            if values['status'] == 'Applied':
+                self._index_application(cursor.lastrowid)
+            self.dirty = True
+            return cursor.lastrowid
+
+    def add_new_jobs(self, rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Insert rows whose title/company is not tracked yet, commit, and return the rows added"""
+        added = []
+        with self._lock:
+            for row in rows:
+                if self.find_job(row.get('Title', ''), row.get('Company', ''), row.get('Website_Link', '')) is None:
+                    self.add_job(row)
+                    added.append(row)
+            self.conn.commit()
+        return added
+
+    def get_jobs_by_status(self, status) -> pd.DataFrame:
+        """Jobs with the given status as a workbook-shaped DataFrame indexed by id"""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,)).fetchall()
+        return self._to_frame(rows)
+
+    def get_jobs(self, job_ids: Iterable[int]) -> pd.DataFrame:
+        """Jobs with the given ids as a workbook-shaped DataFrame indexed by id"""
+        job_ids = sorted(set(job_ids))
+        rows = []
+        with self._lock:
+            for start in range(0, len(job_ids), 500):
+                chunk = job_ids[start:start + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                rows += self.conn.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders}) ORDER BY id", chunk).fetchall()
+        return self._to_frame(rows)
+
+    def _index_application(self, job_id):
+        """(Re)index one job's company tokens if it is an application, or drop it from the index"""
+        self.conn.execute("DELETE FROM application_tokens WHERE job_id = ?", (job_id,))
+        row = self.conn.execute("SELECT company, status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row and row['status'] == 'Applied':
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO application_tokens (token, job_id) VALUES (?, ?)",
+                [(token, job_id) for token in company_tokens(row['company'])]
+            )
+
+    def find_applications(self, tokens: Iterable[str], max_postings=None) -> Dict[str, Set[int]]:
+        """Map each token to the ids of applications indexed under it
+
+        Tokens without applications are left out, as are tokens shared by more
+        than max_postings applications ("systems", "group"), which say little
+        about which application a response belongs to.
+        """
+        tokens = sorted(set(tokens))
+        postings = {}
+        with self._lock:
+            for start in range(0, len(tokens), 500):
+                chunk = tokens[start:start + 500]
+                if max_postings:
+                    placeholders = ', '.join('?' for _ in chunk)
+                    chunk = [
+                        row['token'] for row in self.conn.execute(
+                            f"SELECT token FROM application_tokens WHERE token IN ({placeholders}) "
+                            f"GROUP BY token HAVING COUNT(*) <= ?", chunk + [max_postings]
+                        )
+                    ]
+                    if not chunk:
+                        continue
+                placeholders = ', '.join('?' for _ in chunk)
+                for row in self.conn.execute(
+                    f"SELECT token, job_id FROM application_tokens WHERE token IN ({placeholders})", chunk
+                ):
+                    postings.setdefault(row['token'], set()).add(row['job_id'])
+        return postings
+
+    def record_response(self, job_id, response_type, response_date, notes) -> bool:
+        """Store a recruiter response unless one is already recorded for the job"""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET recruiter_response = ?, response_date = ?, notes = ? "
+                "WHERE id = ? AND recruiter_response = ''",
+                (response_type, response_date, notes, job_id)
+            )
+            self.conn.commit()
+            if cursor.rowcount:
+                self.dirty = True
+            return cursor.rowcount > 0
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """All jobs as a workbook-shaped DataFrame indexed by id"""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        return self._to_frame(rows)
+
+    def _to_frame(self, rows) -> pd.DataFrame:
+        data = {excel_column: [row[column] for row in rows] for excel_column, column in EXCEL_COLUMNS.items()}
+        return typed_frame(pd.DataFrame(data, index=pd.Index([row['id'] for row in rows], name='id')))
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+            self.conn.commit()
+
+    @metrics.timed('store_import_excel')
+    def import_excel(self, excel_file) -> int:
+        """One-time import of an existing workbook into an empty store"""
+        if self.count() > 0 or not os.path.exists(excel_file):
+            return 0
+
+        df = pd.read_excel(excel_file)
+        with self._lock:
+            snapshot = [(self.add_job(row), row_hash(row)) for row in df.to_dict('records')]
+            self._remember_workbook(excel_file, snapshot, replace=True)
+            self.dirty = False
+        self.logger.info(f"Imported {len(df)} rows from {excel_file}")
+        return len(df)
+
+    def workbook_changed(self, excel_file) -> bool:
+        """Whether the workbook differs from the one last exported or synced
+
+        Same mtime and size means unchanged; otherwise the content hash
+        decides, so a copied or touched but unmodified file is not re-parsed.
+        """
+        fingerprint = json.loads(self.get_meta('excel_fingerprint', '{}'))
+        stat = os.stat(excel_file)
+        if fingerprint.get('mtime') == stat.st_mtime and fingerprint.get('size') == stat.st_size:
+            return False
+        if fingerprint.get('size') == stat.st_size and fingerprint.get('sha256') == file_sha256(excel_file):
+            with self._lock:
+                self._remember_workbook(excel_file)
+            return False
+        return True
+
+    @metrics.timed('store_sync_excel')
+    def sync_from_excel(self, excel_file) -> int:
+        """Pull hand edits (Status, Date_Applied, Notes, new rows) back from the workbook
+
+        Skipped when the workbook is unchanged since the last export or sync.
+        Otherwise only rows whose editable cells differ from the snapshot taken
+        then are applied, so values the store changed since (recorded
+        responses) are not overwritten by the older workbook. Rows are matched
+        by their Job_ID column, falling back to the title/company/link key for
+        rows added by hand or older workbooks.
+        """
+        self.last_sync = {'added': 0, 'edited': 0, 'applied': []}
+        if not os.path.exists(excel_file) or not self.workbook_changed(excel_file):
+            return 0
+
+        df = pd.read_excel(excel_file)
+        snapshot = []
+        with self._lock:
+            known = dict(self.conn.execute("SELECT job_id, row_hash FROM workbook_rows").fetchall())
+            known_ids = {row['id'] for row in self.conn.execute("SELECT id FROM jobs")}
+            for row in df.to_dict('records'):
+                job_id = pd.to_numeric(row.get(ID_COLUMN), errors='coerce')
+                if pd.notna(job_id) and int(job_id) in known_ids:
+                    job_id = int(job_id)
+                else:
+                    job_id = self.find_job(row.get('Title', ''), row.get('Company', ''), clean_cell(row.get('Website_Link')))
+                if job_id is None:
+                    snapshot.append((self.add_job(row), row_hash(row)))
+                    self.last_sync['added'] += 1
+                    continue
+
+                digest = row_hash(row)
+                if known.get(job_id) == digest:
+                    continue
+                snapshot.append((job_id, digest))
+                if self._apply_edits(job_id, row):
+                    self.last_sync['edited'] += 1
+            self._remember_workbook(excel_file, snapshot)
+
+        changed = self.last_sync['added'] + self.last_sync['edited']
+        if changed:
+            self.dirty = True
+            self.logger.info(
+                f"Synced {self.last_sync['edited']} edited rows ({len(self.last_sync['applied'])} moved to Applied) "
+                f"and {self.last_sync['added']} new rows from {excel_file}"
+            )
+        return changed
+
+    def _apply_edits(self, job_id, row) -> bool:
+        """Write a workbook row's editable cells to the store, reindexing the job if its status changed"""
+        updates = {
+            EXCEL_COLUMNS[c]: (clean_date if c in DATE_COLUMNS else clean_cell)(row.get(c))
+            for c in USER_EDITABLE_COLUMNS if c in row
+        }
+        if not updates:
+            return False
+        current = self.conn.execute(f"SELECT {', '.join(updates)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if current is None or all(current[column] == value for column, value in updates.items()):
+            return False
+
+        assignments = ', '.join(f"{column} = ?" for column in updates)
+        self.conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", list(updates.values()) + [job_id])
+        if 'status' in updates and current['status'] != updates['status']:
+            self._index_application(job_id)
+            if updates['status'] == 'Applied':
+                self.last_sync['applied'].append(job_id)
+        return True
+
+    @metrics.timed('store_export_excel')
+    def export_excel(self, excel_file, force=False) -> bool:
+        """Write the workbook from the store if anything changed since the last export"""
+        if not force and not self.dirty and os.path.exists(excel_file):
+            return False
+
+        os.makedirs(os.path.dirname(excel_file) or '.', exist_ok=True)
+        # Cleared together with the read, so a change landing during the write marks the store dirty again
+        with self._lock:
+            self.dirty = False
+            df = self.to_dataframe().reset_index().rename(columns={'id': ID_COLUMN})
+        try:
+            with pd.ExcelWriter(excel_file, date_format='YYYY-MM-DD', datetime_format='YYYY-MM-DD') as writer:
+                df.to_excel(writer, index=False)
+            with self._lock:
+                snapshot = [(int(row[ID_COLUMN]), row_hash(row)) for row in df[[ID_COLUMN] + USER_EDITABLE_COLUMNS].to_dict('records')]
+                self._remember_workbook(excel_file, snapshot, replace=True)
+        except Exception:
+            self.dirty = True
+            raise
+        self.logger.info(f"Exported {len(df)} jobs to {excel_file}")
+        return True
+
+    def _remember_workbook(self, excel_file, snapshot=(), replace=False):
+        """Record the workbook's fingerprint and the editable cells of the given (id, row hash) rows, then commit"""
+        stat = os.stat(excel_file)
+        fingerprint = {'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': file_sha256(excel_file)}
+        if replace:
+            self.conn.execute("DELETE FROM workbook_rows")
+        self.conn.executemany("INSERT OR REPLACE INTO workbook_rows (job_id, row_hash) VALUES (?, ?)", snapshot)
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('excel_fingerprint', ?)", (json.dumps(fingerprint),))
+        self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -1,49 +1,176 @@
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import itertools
 import time
-import schedule
 from datetime import datetime
 import json
 import logging
 import os
 import sys
+import threading
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Tuple, Iterable, Iterator
+from urllib.parse import urljoin, quote
 
 # Add the project root to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.email_tracker import EmailResponseTracker
+from src.browser_pool import WebDriverPool, PortalRateLimiter
+from src.http_fetcher import HttpFetcher
+from src.fetch_cache import FetchCache
+from src.metrics import metrics, ThreadProfiler
+from src.job_store import job_key
+from src.profiles import Profile, load_profiles
+from src.scheduler import Scheduler, Task
+from src.inbox_listener import InboxListener
 from src.utils import setup_logging, create_directories
 
+# Fallback selectors for portals whose config omits some (or all) of them
+DEFAULT_PORTAL_SELECTORS = {
+    'indeed': {
+        'job_card': '[data-jk]',
+        'title': 'h2 a span',
+        'company': '[data-testid="company-name"]',
+        'link': 'h2 a',
+        'location': '[data-testid="job-location"]'
+    },
+    'linkedin': {
+        'job_card': '.job-search-card',
+        'title': '.base-search-card__title',
+        'company': '.base-search-card__subtitle',
+        'link': '.base-card__full-link',
+        'location': '.job-search-card__location',
+        'show_more': 'button.infinite-scroller__show-more-button'
+    }
+}
+
+# Result page URLs ({keywords}, {location}, {start} = index of the first
+# result, {page} = 1-based page number) and paging behaviour per portal
+DEFAULT_PAGINATION = {
+    'indeed': {
+        'page_url': 'https://indeed.com/jobs?q={keywords}&l={location}&start={start}',
+        'page_size': 10
+    },
+    'linkedin': {
+        'page_url': 'https://linkedin.com/jobs/search/?keywords={keywords}&location={location}&start={start}',
+        'page_size': 25,
+        'infinite_scroll': True
+    }
+}
+
+# Stop paging once this share of a page's jobs is already tracked
+DEFAULT_STOP_KNOWN_RATIO = 0.8
+
+# Seconds to wait for the first job card before treating a page as empty
+DEFAULT_WAIT_TIMEOUT = 10
+
+PORTAL_NAMES = {
+    'indeed': 'Indeed',
+    'linkedin': 'LinkedIn'
+}
+
+# Reads every job card in a single execute_script call. Arguments are the
+# portal selectors and the maximum number of cards to return.
+EXTRACT_CARDS_SCRIPT = """
+const selectors = arguments[0];
+const limit = arguments[1];
+const cards = Array.from(document.querySelectorAll(selectors.job_card));
+
+function field(card, name, read) {
+    const el = card.querySelector(selectors[name]);
+    if (!el) {
+        throw new Error('no element matching ' + selectors[name] + ' for ' + name);
+    }
+    return read(el);
+}
+
+const text = (el) => (el.innerText || el.textContent || '').trim();
+
+return {
+    total: cards.length,
+    cards: cards.slice(0, limit).map((card) => {
+        try {
+            return {
+                title: field(card, 'title', text),
+                company: field(card, 'company', text),
+                link: field(card, 'link', (el) => el.href || el.getAttribute('href') || '')
+            };
+        } catch (e) {
+            return {error: String(e && e.message ? e.message : e)};
+        }
+    })
+};
+"""
+
+# Scrolls an infinite-scroll result list to the bottom and presses its
+# "show more" button (arguments[0], may be empty) when it is visible
+LOAD_MORE_SCRIPT = """
+window.scrollTo(0, document.body.scrollHeight);
+if (arguments[0]) {
+    const button = document.querySelector(arguments[0]);
+    if (button && button.offsetParent !== null) {
+        button.click();
+    }
+}
+"""
+
 class JobTrackingAgent:
-    def __init__(self, config_file='config/job_config.json'):
+    def __init__(self, config_file='config/job_config.json', offline=False):
         self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.config_path = os.path.join(self.project_root, config_file)
-        self.config = self.load_config()
-        self.excel_file = os.path.join(self.project_root, 'data', self.config.get('excel_file', 'job_applications.xlsx'))
         
-        # Setup logging
+        # Setup logging (load_config logs, so this has to come first)
         log_dir = os.path.join(self.project_root, 'logs')
         setup_logging(log_dir)
         self.logger = logging.getLogger(__name__)
         
+        self.config = self.load_config()
+        # Relative data_dir values are resolved against the project root
+        self.data_dir = os.path.join(self.project_root, self.config.get('data_dir', 'data'))
+        self.last_scrape_stats = {}
+        self.page_timings = []
+        self.stage_timings = {}
+        self.pagination_stats = []
+        
+        # Rate-limit waits of the current search, per scraper thread
+        self._throttle = threading.local()
+        
+        # Deep paging without early termination (--backfill)
+        self.backfill = False
+        
+        # Replay scraping from the fetch cache without network access (--offline)
+        self.offline = offline
+        
+        # ThreadProfiler while a run is profiled (--profile)
+        self.profiler = None
+        
+        # Scheduled tasks run on separate threads and all sync/export the workbooks
+        self._workbook_lock = threading.Lock()
+        
         # Create necessary directories
         create_directories(self.project_root)
+        os.makedirs(self.data_dir, exist_ok=True)
         
-        # Setup driver
+        # Setup driver pool (browsers start lazily on the first Selenium scrape)
         self.setup_driver()
         
-        # Initialize email tracker
-        self.email_tracker = EmailResponseTracker(self.config)
+        # One job store, workbook and mailbox per profile (just the config's own
+        # unless it lists profiles); all share the browser pool and HTTP cache
+        self.profiles = load_profiles(self.config, self.project_root)
+        primary = self.profiles[0]
+        self.store = primary.store
+        self.excel_file = primary.excel_file
+        self.email_tracker = primary.email_tracker
         
     def load_config(self):
         """Load configuration from JSON file"""
@@ -76,6 +203,14 @@ class JobTrackingAgent:
                 "indeed": {
                     "enabled": True,
                     "base_url": "https://indeed.com/jobs",
+                    "wait_timeout": 10,
+                    "backend": "auto",
+                    "extraction": "script",
+                    "page_url": "https://indeed.com/jobs?q={keywords}&l={location}&start={start}",
+                    "page_size": 10,
+                    "max_pages": 3,
+                    "backfill_max_pages": 20,
+                    "stop_known_ratio": 0.8,
                     "selectors": {
                         "job_card": "[data-jk]",
                         "title": "h2 a span",
@@ -86,7 +221,24 @@ class JobTrackingAgent:
                 },
                 "linkedin": {
                     "enabled": True,
-                    "base_url": "https://linkedin.com/jobs/search"
+                    "base_url": "https://linkedin.com/jobs/search",
+                    "wait_timeout": 15,
+                    "backend": "auto",
+                    "extraction": "script",
+                    "page_url": "https://linkedin.com/jobs/search/?keywords={keywords}&location={location}&start={start}",
+                    "page_size": 25,
+                    "infinite_scroll": True,
+                    "max_pages": 3,
+                    "backfill_max_pages": 20,
+                    "stop_known_ratio": 0.8,
+                    "selectors": {
+                        "job_card": ".job-search-card",
+                        "title": ".base-search-card__title",
+                        "company": ".base-search-card__subtitle",
+                        "link": ".base-card__full-link",
+                        "location": ".job-search-card__location",
+                        "show_more": "button.infinite-scroller__show-more-button"
+                    }
                 }
             },
             "email_config": {
@@ -95,16 +247,124 @@ class JobTrackingAgent:
                 "email": "your_email@gmail.com",
                 "password": "your_app_password",
                 "imap_server": "imap.gmail.com",
-                "imap_port": 993
+                "imap_port": 993,
+                "imap_ssl": True,
+                "mailbox": "inbox",
+                "max_messages_per_run": 100,
+                "fetch_batch_size": 200,
+                "header_prefilter": True,
+                "parse_workers": 0,
+                "parse_chunk_size": 50,
+                "parse_pool_min_messages": 50,
+                "max_token_postings": 50,
+                "signature_window_chars": 2000,
+                "free_mail_domains": ["gmail", "yahoo", "outlook", "hotmail", "aol", "icloud"],
+                "idle": False,
+                "idle_keepalive_seconds": 1500,
+                "idle_backoff_seconds": 5,
+                "idle_backoff_max_seconds": 300
             },
+            "profiles": [],
+            "data_dir": "data",
             "excel_file": "job_applications.xlsx",
-            "schedule_time": "09:00",
+            "database_file": "job_tracker.db",
+            "schedule": {
+                "scrape": {"cron": "0 9 * * *", "jitter_seconds": 300, "overlap": "skip"},
+                "email": {"interval_minutes": 10, "jitter_seconds": 30, "overlap": "coalesce"},
+                "notify": {"cron": "0 10 * * *", "jitter_seconds": 0, "overlap": "skip"}
+            },
             "max_jobs_per_run": 20,
-            "delay_between_requests": 2
+            "store_batch_size": 20,
+            "delay_between_requests": 2,
+            "browser_pool_size": 2,
+            "browser_max_page_loads": 100,
+            "browser_max_rss_mb": 1024,
+            "http_cache": {
+                "enabled": True,
+                "file": "http_cache.db",
+                "ttl_seconds": 21600,
+                "max_mb": 50
+            },
+            "metrics": {
+                "enabled": True,
+                "prometheus_file": ""
+            }
         }
     
+    @metrics.timed('setup_driver')
     def setup_driver(self):
-        """Setup Selenium WebDriver with automatic ChromeDriver management"""
+        """Setup the pool of Selenium WebDriver sessions used for scraping"""
+        pool_size = self.config.get('browser_pool_size', 1)
+        self.driver_pool = WebDriverPool(
+            self.create_driver,
+            pool_size,
+            max_page_loads=self.config.get('browser_max_page_loads', 100),
+            max_rss_mb=self.config.get('browser_max_rss_mb', 1024)
+        )
+        self._chromedriver_path = None
+        self._chromedriver_lock = threading.Lock()
+        
+        portal_delays = {
+            name: portal['delay_between_requests']
+            for name, portal in self.config.get('portals', {}).items()
+            if 'delay_between_requests' in portal
+        }
+        self.rate_limiter = PortalRateLimiter(
+            self.config.get('delay_between_requests', 2), portal_delays
+        )
+        
+        cache_config = self.config.get('http_cache', {})
+        cache = None
+        if cache_config.get('enabled', True) or self.offline:
+            cache = FetchCache(
+                os.path.join(self.data_dir, cache_config.get('file', 'http_cache.db')),
+                ttl=cache_config.get('ttl_seconds', 6 * 3600),
+                max_bytes=cache_config.get('max_mb', 50) * 1024 * 1024
+            )
+        self.http_fetcher = HttpFetcher(pool_size=max(pool_size, 2), cache=cache, offline=self.offline)
+        self.logger.info(f"WebDriver pool ready (max {self.driver_pool.size} sessions)")
+    
+    def resolve_chromedriver_path(self, stale_path: str = None) -> str:
+        """Return the chromedriver path, resolving it through WebDriver Manager only once
+        
+        The resolved path is cached in data/chromedriver_path.json so later
+        starts skip the ChromeDriverManager lookup while the binary still exists.
+        Passing the path of a driver that no longer matches the installed
+        Chrome drops that cache and resolves the path again.
+        """
+        with self._chromedriver_lock:
+            cache_file = os.path.join(self.data_dir, 'chromedriver_path.json')
+            if stale_path and self._chromedriver_path in (None, stale_path):
+                # Another thread may have refreshed it already
+                self.logger.info(f"Discarding cached chromedriver {stale_path}")
+                self._chromedriver_path = None
+                try:
+                    os.remove(cache_file)
+                except FileNotFoundError:
+                    pass
+            elif self._chromedriver_path and os.path.exists(self._chromedriver_path):
+                return self._chromedriver_path
+            
+            try:
+                with open(cache_file, 'r') as f:
+                    cached_path = json.load(f).get('path')
+                if cached_path and os.path.exists(cached_path):
+                    self._chromedriver_path = cached_path
+                    return cached_path
+            except (OSError, ValueError):
+                pass
+            
+            self._chromedriver_path = ChromeDriverManager().install()
+            try:
+                with open(cache_file, 'w') as f:
+                    json.dump({'path': self._chromedriver_path, 'resolved_at': datetime.now().isoformat()}, f)
+            except OSError as e:
+                self.logger.warning(f"Could not cache chromedriver path: {e}")
+            return self._chromedriver_path
+    
+    @metrics.timed('driver_create')
+    def create_driver(self):
+        """Create a Selenium WebDriver with automatic ChromeDriver management"""
         try:
             chrome_options = Options()
             chrome_options.add_argument("--headless")
@@ -115,224 +375,602 @@ class JobTrackingAgent:
             chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
             
             # Use WebDriver Manager to automatically download and manage ChromeDriver
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            chromedriver_path = self.resolve_chromedriver_path()
+            try:
+                driver = webdriver.Chrome(service=Service(chromedriver_path), options=chrome_options)
+            except SessionNotCreatedException as e:
+                # The cached driver no longer matches Chrome (usually after a browser update)
+                self.logger.warning(f"ChromeDriver at {chromedriver_path} could not start a session, resolving it again: {e.msg}")
+                chromedriver_path = self.resolve_chromedriver_path(stale_path=chromedriver_path)
+                driver = webdriver.Chrome(service=Service(chromedriver_path), options=chrome_options)
             self.logger.info("WebDriver setup successful")
+            return driver
             
         except Exception as e:
             self.logger.error(f"Error setting up WebDriver: {e}")
             raise
     
-    def load_or_create_excel(self):
-        """Load existing Excel file or create new one"""
-        columns = [
-            'Date_Found', 'Title', 'Company', 'Location', 'Website_Link', 
-            'Portal', 'Status', 'Date_Applied', 'Recruiter_Response', 
-            'Response_Date', 'Notes'
-        ]
+    def get_portal_selectors(self, portal: str) -> Dict[str, str]:
+        """Return the CSS selectors for a portal, falling back to the defaults"""
+        selectors = dict(DEFAULT_PORTAL_SELECTORS.get(portal, {}))
+        selectors.update(self.config.get('portals', {}).get(portal, {}).get('selectors', {}))
+        return selectors
+    
+    @metrics.timed('http_page')
+    def fetch_job_cards_http(self, portal: str, url: str, limit: int) -> Tuple[int, List[Dict]]:
+        """Fetch a search page without a browser and parse its job cards"""
+        portal_config = self.config.get('portals', {}).get(portal, {})
+        timeout = portal_config.get('wait_timeout', DEFAULT_WAIT_TIMEOUT)
+        
+        started = time.monotonic()
+        result = self.http_fetcher.fetch_cards(url, self.get_portal_selectors(portal), limit, timeout=timeout)
+        
+        elapsed = time.monotonic() - started
+        self.page_timings.append({'portal': portal, 'url': url, 'seconds': elapsed, 'ready': result[0] > 0, 'backend': 'http'})
+        self.logger.info(f"{portal} page fetched over HTTP in {elapsed:.2f}s")
+        return result
+    
+    def load_search_page(self, driver, portal: str, url: str) -> bool:
+        """Open a search page and wait until its job cards are rendered"""
+        portal_config = self.config.get('portals', {}).get(portal, {})
+        timeout = portal_config.get('wait_timeout', DEFAULT_WAIT_TIMEOUT)
+        job_card = self.get_portal_selectors(portal)['job_card']
         
+        started = time.monotonic()
+        with metrics.timer('driver_get'):
+            driver.get(url)
+        self.driver_pool.record_page_load(driver)
         try:
-            if os.path.exists(self.excel_file):
-                df = pd.read_excel(self.excel_file)
-                # Add missing columns if they don't exist
-                for col in columns:
-                    if col not in df.columns:
-                        df[col] = ''
-                self.logger.info(f"Loaded existing Excel file with {len(df)} records")
-            else:
-                df = pd.DataFrame(columns=columns)
-                self.logger.info("Created new Excel file structure")
-            
-            return df
-            
-        except Exception as e:
-            self.logger.error(f"Error loading Excel file: {e}")
-            return pd.DataFrame(columns=columns)
+            WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, job_card))
+            )
+            ready = True
+        except TimeoutException:
+            self.logger.warning(f"No job cards on {portal} after {timeout}s: {url}")
+            ready = False
+        
+        elapsed = time.monotonic() - started
+        self.page_timings.append({'portal': portal, 'url': url, 'seconds': elapsed, 'ready': ready, 'backend': 'selenium'})
+        self.logger.info(f"{portal} page ready in {elapsed:.2f}s")
+        return ready
     
-    def scrape_indeed(self, keywords: str, location: str) -> List[Dict]:
-        """Scrape job listings from Indeed"""
-        jobs = []
+    @metrics.timed('card_extraction')
+    def extract_job_cards(self, driver, portal: str, limit: int, mode: str = 'script') -> Tuple[int, List[Dict]]:
+        """Read title/company/link from the rendered job cards
+        
+        Returns the total number of cards on the page and one dict per card
+        (up to limit). A card that could not be read has an 'error' key instead.
+        """
+        selectors = self.get_portal_selectors(portal)
+        
+        if mode == 'script':
+            # One WebDriver round trip for the whole page
+            result = driver.execute_script(EXTRACT_CARDS_SCRIPT, selectors, limit)
+            return result['total'], result['cards']
+        
+        # Element-by-element path: several round trips per card
+        job_cards = driver.find_elements(By.CSS_SELECTOR, selectors['job_card'])
+        cards = []
+        for card in job_cards[:limit]:
+            try:
+                cards.append({
+                    'title': card.find_element(By.CSS_SELECTOR, selectors['title']).text,
+                    'company': card.find_element(By.CSS_SELECTOR, selectors['company']).text,
+                    'link': card.find_element(By.CSS_SELECTOR, selectors['link']).get_attribute('href')
+                })
+            except Exception as e:
+                cards.append({'error': str(e)})
+        return len(job_cards), cards
+    
+    def get_pagination(self, portal: str) -> Dict[str, Any]:
+        """Return the paging settings for a portal, falling back to the defaults"""
+        pagination = dict(DEFAULT_PAGINATION.get(portal, {}))
+        portal_config = self.config.get('portals', {}).get(portal, {})
+        for key in ('page_url', 'page_size', 'infinite_scroll'):
+            if key in portal_config:
+                pagination[key] = portal_config[key]
+        return pagination
+    
+    def page_url(self, portal: str, keywords: str, location: str, page: int) -> str:
+        """URL of a 0-based result page of a search"""
+        pagination = self.get_pagination(portal)
+        return pagination['page_url'].format(
+            keywords=quote(keywords, safe=''),
+            location=quote(location, safe=''),
+            start=page * pagination.get('page_size', 10),
+            page=page + 1
+        )
+    
+    def load_more_results(self, driver, portal: str, loaded: int) -> bool:
+        """Scroll an infinite-scroll result list and wait for more than `loaded` job cards"""
+        portal_config = self.config.get('portals', {}).get(portal, {})
+        timeout = portal_config.get('wait_timeout', DEFAULT_WAIT_TIMEOUT)
+        selectors = self.get_portal_selectors(portal)
+        
+        started = time.monotonic()
+        driver.execute_script(LOAD_MORE_SCRIPT, selectors.get('show_more', ''))
         try:
-            search_url = f"https://indeed.com/jobs?q={keywords.replace(' ', '+')}&l={location.replace(' ', '+')}"
-            self.logger.info(f"Scraping Indeed: {search_url}")
-            
-            self.driver.get(search_url)
-            time.sleep(3)
-            
-            job_cards = self.driver.find_elements(By.CSS_SELECTOR, '[data-jk]')
-            self.logger.info(f"Found {len(job_cards)} job cards on Indeed")
-            
-            for i, card in enumerate(job_cards[:self.config.get('max_jobs_per_run', 20)]):
+            WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+                lambda d: d.execute_script(
+                    "return document.querySelectorAll(arguments[0]).length", selectors['job_card']
+                ) > loaded
+            )
+            grew = True
+        except TimeoutException:
+            grew = False
+        
+        elapsed = time.monotonic() - started
+        self.page_timings.append({'portal': portal, 'url': driver.current_url, 'seconds': elapsed, 'ready': grew, 'backend': 'selenium-scroll'})
+        return grew
+    
+    def iter_result_pages(self, portal: str, keywords: str, location: str, limit: int) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yield (url, job cards) for successive result pages of a search
+        
+        portals.<name>.backend picks how pages are fetched: "http" (requests +
+        lxml only), "selenium" (headless Chrome only) or "auto" (HTTP first,
+        Chrome when the static HTML of the first page has no job cards).
+        Portals with infinite_scroll page by scrolling in Chrome.
+        """
+        portal_name = PORTAL_NAMES.get(portal, portal.title())
+        portal_config = self.config.get('portals', {}).get(portal, {})
+        backend = 'http' if self.offline else portal_config.get('backend', 'auto')
+        extraction = portal_config.get('extraction', 'script')
+        
+        if backend in ('http', 'auto'):
+            for page in itertools.count():
+                url = self.page_url(portal, keywords, location, page)
+                self.throttle(portal)
                 try:
-                    title_elem = card.find_element(By.CSS_SELECTOR, 'h2 a span')
-                    company_elem = card.find_element(By.CSS_SELECTOR, '[data-testid="company-name"]')
-                    link_elem = card.find_element(By.CSS_SELECTOR, 'h2 a')
-                    
-                    job = {
-                        'title': title_elem.text.strip(),
-                        'company': company_elem.text.strip(),
-                        'location': location,
-                        'link': 'https://indeed.com' + link_elem.get_attribute('href'),
-                        'portal': 'Indeed',
-                        'date_found': datetime.now().strftime('%Y-%m-%d')
-                    }
-                    jobs.append(job)
-                    
+                    total, cards = self.fetch_job_cards_http(portal, url, limit)
                 except Exception as e:
-                    self.logger.warning(f"Error parsing Indeed job card {i}: {e}")
-                    continue
-                    
-        except Exception as e:
-            self.logger.error(f"Error scraping Indeed: {e}")
+                    self.logger.warning(f"HTTP fetch failed for {portal_name}: {e}")
+                    total, cards = 0, []
+                
+                if total == 0 and backend == 'auto' and page == 0:
+                    self.logger.info(f"No job cards in static {portal_name} page, falling back to Selenium")
+                    break
+                yield url, cards
         
+        # The generator holds its browser session until the caller stops paging
+        with self.driver_pool.acquire() as driver:
+            if self.get_pagination(portal).get('infinite_scroll'):
+                url = self.page_url(portal, keywords, location, 0)
+                self.throttle(portal)
+                self.load_search_page(driver, portal, url)
+                read = 0
+                while True:
+                    total, cards = self.extract_job_cards(driver, portal, read + limit, extraction)
+                    yield url, cards[read:]
+                    read = len(cards)
+                    if read >= total:
+                        self.throttle(portal)
+                        if not self.load_more_results(driver, portal, total):
+                            return
+            else:
+                for page in itertools.count():
+                    url = self.page_url(portal, keywords, location, page)
+                    self.throttle(portal)
+                    self.load_search_page(driver, portal, url)
+                    total, cards = self.extract_job_cards(driver, portal, limit, extraction)
+                    yield url, cards
+    
+    @metrics.timed('card_parsing')
+    def parse_job_cards(self, portal_name: str, page_url: str, location: str, cards: List[Dict]) -> List[Dict]:
+        """Turn extracted job cards into job dicts, skipping unreadable cards"""
+        jobs = []
+        for i, card in enumerate(cards):
+            try:
+                if card.get('error'):
+                    raise ValueError(card['error'])
+                
+                job = {
+                    'title': card['title'].strip(),
+                    'company': card['company'].strip(),
+                    'location': location,
+                    'link': urljoin(page_url, card['link']),
+                    'portal': portal_name,
+                    'date_found': datetime.now().strftime('%Y-%m-%d')
+                }
+                jobs.append(job)
+                
+            except Exception as e:
+                self.logger.warning(f"Error parsing {portal_name} job card {i}: {e}")
+                continue
         return jobs
     
-    def scrape_linkedin(self, keywords: str, location: str) -> List[Dict]:
-        """Scrape job listings from LinkedIn"""
+    def scrape_portal(self, portal: str, keywords: str, location: str, profiles: List[Profile] = None) -> List[Dict]:
+        """Scrape a portal's search results page by page
+        
+        Reads up to portals.<name>.max_pages pages (backfill_max_pages with
+        --backfill) and stops early on a page without new results, or once
+        stop_known_ratio of a page's jobs are already tracked: results are
+        newest first, so later pages hold listings seen on earlier runs.
+        Only jobs passing the title filter count, since the others are never
+        stored. A search shared by several profiles (default: the agent's
+        own) counts a job as tracked only when every profile wanting it has it.
+        """
+        profiles = profiles or self.profiles[:1]
+        filters = [(profile, self.title_filter(profile.config['search_parameters'])) for profile in profiles]
+        portal_name = PORTAL_NAMES.get(portal, portal.title())
+        portal_config = self.config.get('portals', {}).get(portal, {})
+        limit = self.config.get('max_jobs_per_run', 20)
+        if self.backfill:
+            max_pages = portal_config.get('backfill_max_pages', 20)
+        else:
+            max_pages = portal_config.get('max_pages', 1)
+        stop_known_ratio = portal_config.get('stop_known_ratio', DEFAULT_STOP_KNOWN_RATIO)
+        
         jobs = []
+        links = set()
+        pages = 0
+        stop_reason = f"reached {max_pages} pages"
+        self.logger.info(f"Scraping {portal_name} for '{keywords}'")
+        
+        result_pages = self.iter_result_pages(portal, keywords, location, limit)
         try:
-            search_url = f"https://linkedin.com/jobs/search/?keywords={keywords.replace(' ', '%20')}&location={location.replace(' ', '%20')}"
-            self.logger.info(f"Scraping LinkedIn: {search_url}")
-            
-            self.driver.get(search_url)
-            time.sleep(5)
-            
-            job_cards = self.driver.find_elements(By.CSS_SELECTOR, '.job-search-card')
-            self.logger.info(f"Found {len(job_cards)} job cards on LinkedIn")
-            
-            for i, card in enumerate(job_cards[:self.config.get('max_jobs_per_run', 20)]):
-                try:
-                    title_elem = card.find_element(By.CSS_SELECTOR, '.base-search-card__title')
-                    company_elem = card.find_element(By.CSS_SELECTOR, '.base-search-card__subtitle')
-                    link_elem = card.find_element(By.CSS_SELECTOR, '.base-card__full-link')
-                    
-                    job = {
-                        'title': title_elem.text.strip(),
-                        'company': company_elem.text.strip(),
-                        'location': location,
-                        'link': link_elem.get_attribute('href'),
-                        'portal': 'LinkedIn',
-                        'date_found': datetime.now().strftime('%Y-%m-%d')
-                    }
-                    jobs.append(job)
-                    
-                except Exception as e:
-                    self.logger.warning(f"Error parsing LinkedIn job card {i}: {e}")
-                    continue
-                    
+            for page_url, cards in result_pages:
+                pages += 1
+                page_jobs = [job for job in self.parse_job_cards(portal_name, page_url, location, cards) if job['link'] not in links]
+                self.logger.info(f"Found {len(cards)} job cards on {portal_name} page {pages}")
+                if not page_jobs:
+                    stop_reason = "no new results"
+                    break
+                
+                links.update(job['link'] for job in page_jobs)
+                jobs.extend(page_jobs)
+                
+                # Profiles wanting each job; jobs nobody wants are filtered out later anyway
+                wanted = [[profile for profile, is_wanted in filters if is_wanted(job)] for job in page_jobs]
+                wanted = [(job, wanting) for job, wanting in zip(page_jobs, wanted) if wanting]
+                known = sum(
+                    all(profile.store.find_job(job['title'], job['company'], job['link']) is not None for profile in wanting)
+                    for job, wanting in wanted
+                )
+                if not self.backfill and wanted and known >= stop_known_ratio * len(wanted):
+                    stop_reason = f"{known} of {len(wanted)} wanted jobs on page {pages} already tracked"
+                    break
+                if pages >= max_pages:
+                    break
         except Exception as e:
-            self.logger.error(f"Error scraping LinkedIn: {e}")
+            self.logger.error(f"Error scraping {portal_name}: {e}")
+            stop_reason = f"error: {e}"
+        finally:
+            # Returns the browser session to the pool if one was used
+            result_pages.close()
         
+        self.pagination_stats.append({'portal': portal, 'keywords': keywords, 'pages': pages, 'stop_reason': stop_reason})
+        self.logger.info(f"{portal_name} '{keywords}': {len(jobs)} jobs from {pages} pages, stopped: {stop_reason}")
         return jobs
     
-    def filter_jobs(self, jobs: List[Dict]) -> List[Dict]:
-        """Filter jobs based on parameters"""
-        filtered_jobs = []
-        search_params = self.config['search_parameters']
-        exclude_keywords = search_params.get('exclude_keywords', [])
+    def scrape_indeed(self, keywords: str, location: str, profiles: List[Profile] = None) -> List[Dict]:
+        """Scrape job listings from Indeed"""
+        return self.scrape_portal('indeed', keywords, location, profiles)
+    
+    def scrape_linkedin(self, keywords: str, location: str, profiles: List[Profile] = None) -> List[Dict]:
+        """Scrape job listings from LinkedIn"""
+        return self.scrape_portal('linkedin', keywords, location, profiles)
+    
+    def title_filter(self, search_params: Dict = None) -> Callable[[Dict], bool]:
+        """Predicate: does a job's title match a search keyword and no exclude keyword"""
+        search_params = search_params or self.config['search_parameters']
+        exclude_keywords = [keyword.lower() for keyword in search_params.get('exclude_keywords', [])]
+        keywords = [keyword.lower() for keyword in search_params['keywords']]
         
-        for job in jobs:
+        def wanted(job):
             title_lower = job['title'].lower()
-            
-            # Check if title contains any exclude keywords
-            if any(keyword.lower() in title_lower for keyword in exclude_keywords):
-                continue
-                
-            # Check if title contains desired keywords
-            if any(keyword.lower() in title_lower for keyword in search_params['keywords']):
-                filtered_jobs.append(job)
-        
-        self.logger.info(f"Filtered {len(jobs)} jobs down to {len(filtered_jobs)}")
-        return filtered_jobs
+            # Check if title contains any exclude keywords, then desired keywords
+            return (
+                not any(keyword in title_lower for keyword in exclude_keywords)
+                and any(keyword in title_lower for keyword in keywords)
+            )
+        return wanted
     
-    def check_for_new_jobs(self) -> List[Dict]:
-        """Check all portals for new job listings"""
-        all_jobs = []
-        search_params = self.config['search_parameters']
-        portals = self.config['portals']
-        
-        for keyword in search_params['keywords']:
-            self.logger.info(f"Searching for: {keyword}")
-            
-            # Scrape Indeed if enabled
-            if portals.get('indeed', {}).get('enabled', True):
-                indeed_jobs = self.scrape_indeed(keyword, search_params.get('location', 'Remote'))
-                all_jobs.extend(indeed_jobs)
-                time.sleep(self.config.get('delay_between_requests', 2))
-            
-            # Scrape LinkedIn if enabled
-            if portals.get('linkedin', {}).get('enabled', True):
-                linkedin_jobs = self.scrape_linkedin(keyword, search_params.get('location', 'Remote'))
-                all_jobs.extend(linkedin_jobs)
-                time.sleep(self.config.get('delay_between_requests', 2))
+    def filter_jobs(self, jobs: Iterable[Dict], search_params: Dict = None) -> Iterator[Dict]:
+        """Yield the jobs whose title matches a search keyword and no exclude keyword"""
+        is_wanted = self.title_filter(search_params)
         
-        # Filter jobs
-        filtered_jobs = self.filter_jobs(all_jobs)
+        seen = kept = 0
+        # Only time spent filtering counts, not the scraping upstream of it
+        filter_time = 0.0
+        for job in jobs:
+            seen += 1
+            started = time.perf_counter()
+            wanted = is_wanted(job)
+            filter_time += time.perf_counter() - started
+            if wanted:
+                kept += 1
+                yield job
         
-        # Remove duplicates
-        unique_jobs = []
+        metrics.observe('filter_jobs', filter_time)
+        metrics.count('jobs_scraped', seen)
+        metrics.count('jobs_kept_by_filter', kept)
+        self.logger.info(f"Filtered {seen} jobs down to {kept}")
+    
+    def dedupe_jobs(self, jobs: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield each canonical (title, company) only once per run"""
         seen = set()
-        for job in filtered_jobs:
-            key = (job['title'].lower(), job['company'].lower())
+        for job in jobs:
+            key = job_key(job['title'], job['company'])
             if key not in seen:
                 seen.add(key)
-                unique_jobs.append(job)
+                yield job
+    
+    def throttle(self, portal: str):
+        """Wait for the portal's rate limit before fetching a page (not when replaying offline)"""
+        if self.offline:
+            return
+        waited = self.rate_limiter.wait(portal)
+        self._throttle.waited = getattr(self._throttle, 'waited', 0.0) + waited
+    
+    def _run_search(self, portal: str, keyword: str, location: str, profiles: List[Profile] = None) -> Dict:
+        """Run one (keyword, portal) search, every page of it rate-limited"""
+        scrapers = {
+            'indeed': self.scrape_indeed,
+            'linkedin': self.scrape_linkedin
+        }
+        
+        self._throttle.waited = 0.0
+        started = time.monotonic()
+        jobs = []
+        try:
+            jobs = scrapers[portal](keyword, location, profiles)
+        except Exception as e:
+            self.logger.error(f"Error searching {portal} for '{keyword}': {e}")
         
-        self.logger.info(f"Found {len(unique_jobs)} unique new jobs")
-        return unique_jobs
+        # Time spent waiting for the rate limit is not part of the search itself
+        return {'jobs': jobs, 'duration': time.monotonic() - started - self._throttle.waited}
     
-    def update_excel_with_new_jobs(self, new_jobs: List[Dict]):
-        """Add new jobs to Excel file"""
-        df = self.load_or_create_excel()
+    def plan_searches(self, config: Dict) -> List[Tuple[str, str, str]]:
+        """The (portal, keyword, location) searches a config asks for"""
+        search_params = config['search_parameters']
+        portals = config['portals']
+        location = search_params.get('location', 'Remote')
+        
+        searches = []
+        for keyword in search_params['keywords']:
+            for portal in ('indeed', 'linkedin'):
+                if portals.get(portal, {}).get('enabled', True):
+                    searches.append((portal, keyword, location))
+        return searches
+    
+    def scrape_jobs(self) -> Iterator[Dict]:
+        """Yield scraped jobs search by search, as the scraper threads finish them"""
+        for _, jobs in self.run_searches(self.plan_searches(self.config)):
+            yield from jobs
+    
+    def run_searches(self, searches: List[Tuple[str, str, str]], subscribers: Dict = None) -> Iterator[Tuple[Tuple[str, str, str], List[Dict]]]:
+        """Run searches on the scraper threads, yielding (search, jobs) in search order
+        
+        subscribers maps a search to the profiles its early stop checks (see
+        scrape_portal); by default that is the agent's own profile.
+        """
+        subscribers = subscribers or {}
+        self.page_timings = []
+        self.pagination_stats = []
+        if self.http_fetcher.cache is not None:
+            self.http_fetcher.cache.reset_stats()
+        workers = max(1, min(self.driver_pool.size, len(searches)))
+        self.logger.info(f"Running {len(searches)} searches with {workers} browser sessions")
+        
+        durations = []
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scraper') as executor:
+            # map() keeps results in search order so dedup stays deterministic
+            run_search = self.profiler.wrap(self._run_search) if self.profiler else self._run_search
+            results = executor.map(lambda search: run_search(*search, subscribers.get(search)), searches)
+            for search, result in zip(searches, results):
+                durations.append(result['duration'])
+                yield search, result['jobs']
+        wall_time = time.monotonic() - start
         
-        new_rows = []
+        # A sequential run pays every search plus the fixed delay before each page
+        sequential_time = sum(durations)
+        sequential_time += sum(self.rate_limiter.delay_for(timing['portal']) for timing in self.page_timings)
+        self.last_scrape_stats = {
+            'searches': len(searches),
+            'workers': workers,
+            'wall_time': wall_time,
+            'sequential_time': sequential_time,
+            'speedup': sequential_time / wall_time if wall_time > 0 else 1.0,
+            'pages': len(self.page_timings),
+            'stopped_on_known': sum('already tracked' in stats['stop_reason'] for stats in self.pagination_stats),
+            'cache': dict(self.http_fetcher.cache.stats) if self.http_fetcher.cache is not None else None,
+            'cache_hit_rate': self.http_fetcher.cache.hit_rate() if self.http_fetcher.cache is not None else 0.0,
+            'avg_page_time': (
+                sum(t['seconds'] for t in self.page_timings) / len(self.page_timings)
+                if self.page_timings else 0.0
+            )
+        }
+        self.logger.info(
+            f"Scraping took {wall_time:.2f}s wall-clock vs ~{sequential_time:.2f}s sequential "
+            f"({self.last_scrape_stats['speedup']:.1f}x speedup)"
+        )
+    
+    def check_for_new_jobs(self) -> List[Dict]:
+        """Check all portals and store new listings as they arrive
+        
+        Jobs stream through scrape -> filter -> dedupe -> store, so nothing
+        is accumulated and a run that fails part-way keeps what it stored.
+        Returns the rows that were added (for all profiles; each profile
+        keeps its own in profile.new_jobs).
+        """
+        if len(self.profiles) > 1:
+            return self.check_for_new_jobs_shared()
+        profile = self.profiles[0]
+        profile.new_jobs = self.update_excel_with_new_jobs(self.dedupe_jobs(self.filter_jobs(self.scrape_jobs())))
+        return profile.new_jobs
+    
+    def check_for_new_jobs_shared(self) -> List[Dict]:
+        """Run each distinct search of all profiles once and fan its jobs out to the profiles asking for it
+        
+        Scrape volume grows with the number of distinct (portal, keyword,
+        location) searches, not with the number of profiles. As each search
+        finishes, every profile asking for it filters, deduplicates and
+        stores its share, so only one search's jobs are held at a time and
+        a run that fails part-way keeps what it stored.
+        """
+        subscribers = {}
+        for profile in self.profiles:
+            for search in self.plan_searches(profile.config):
+                subscribers.setdefault(search, []).append(profile)
+        requested = sum(len(profiles) for profiles in subscribers.values())
+        self.logger.info(
+            f"{len(self.profiles)} profiles asked for {requested} searches, {len(subscribers)} distinct"
+        )
+        
+        filters = {profile.name: self.title_filter(profile.config['search_parameters']) for profile in self.profiles}
+        seen = {profile.name: set() for profile in self.profiles}
+        for profile in self.profiles:
+            profile.new_jobs = []
+        for search, jobs in self.run_searches(list(subscribers), subscribers):
+            for profile in subscribers[search]:
+                matching = [job for job in jobs if filters[profile.name](job)]
+                metrics.count('jobs_scraped', len(jobs))
+                metrics.count('jobs_kept_by_filter', len(matching))
+                wanted = []
+                for job in matching:
+                    key = job_key(job['title'], job['company'])
+                    if key not in seen[profile.name]:
+                        seen[profile.name].add(key)
+                        wanted.append(job)
+                if wanted:
+                    profile.new_jobs += self.update_excel_with_new_jobs(wanted, profile)
+        self.last_scrape_stats['requested_searches'] = requested
+        
+        added = []
+        for profile in self.profiles:
+            self.logger.info(f"Profile {profile.name}: {len(profile.new_jobs)} new jobs")
+            added += profile.new_jobs
+        return added
+    
+    def update_excel_with_new_jobs(self, new_jobs: Iterable[Dict], profile: Profile = None) -> List[Dict]:
+        """Add new jobs to the (profile's) job store in small committed batches (the workbook is exported at the end of the run)"""
+        store = profile.store if profile else self.store
+        batch_size = max(1, self.config.get('store_batch_size', 20))
+        added = []
+        batch = []
         for job in new_jobs:
-            # Check if job already exists
-            existing = df[
-                (df['Title'].str.lower() == job['title'].lower()) & 
-                (df['Company'].str.lower() == job['company'].lower())
-            ]
-            
-            if existing.empty:
-                new_row = {
-                    'Date_Found': job['date_found'],
-                    'Title': job['title'],
-                    'Company': job['company'],
-                    'Location': job['location'],
-                    'Website_Link': job['link'],
-                    'Portal': job['portal'],
-                    'Status': 'Found',
-                    'Date_Applied': '',
-                    'Recruiter_Response': '',
-                    'Response_Date': '',
-                    'Notes': ''
-                }
-                new_rows.append(new_row)
+            batch.append({
+                'Date_Found': job['date_found'],
+                'Title': job['title'],
+                'Company': job['company'],
+                'Location': job['location'],
+                'Website_Link': job['link'],
+                'Portal': job['portal'],
+                'Status': 'Found',
+                'Date_Applied': '',
+                'Recruiter_Response': '',
+                'Response_Date': '',
+                'Notes': ''
+            })
+            if len(batch) >= batch_size:
+                # Rows already tracked are skipped via the store's canonical key index
+                with metrics.timer('store_add_batch'):
+                    added += store.add_new_jobs(batch)
+                batch = []
+        if batch:
+            with metrics.timer('store_add_batch'):
+                added += store.add_new_jobs(batch)
         
-        if new_rows:
-            new_df = pd.DataFrame(new_rows)
-            df = pd.concat([df, new_df], ignore_index=True)
-            
-            # Ensure data directory exists
-            os.makedirs(os.path.dirname(self.excel_file), exist_ok=True)
-            
-            df.to_excel(self.excel_file, index=False)
-            self.logger.info(f"Added {len(new_rows)} new jobs to {self.excel_file}")
+        if added:
+            self.logger.info(f"Added {len(added)} new jobs to {store.db_path}")
         else:
             self.logger.info("No new jobs found")
+        return added
+    
+    def sync_excel(self):
+        """Pull hand edits (e.g. Status set to Applied) from every profile's workbook"""
+        with self._workbook_lock, metrics.timer('excel_sync'):
+            for profile in self.profiles:
+                profile.store.sync_from_excel(profile.excel_file)
     
-    def check_recruiter_responses(self):
-        """Check for recruiter responses using email tracker"""
+    def export_excel(self, force=False):
+        """Write each profile's workbook from its job store"""
+        for profile in self.profiles:
+            try:
+                with self._workbook_lock, metrics.timer('excel_export'):
+                    profile.store.export_excel(profile.excel_file, force=force)
+            except Exception as e:
+                self.logger.error(f"Error exporting Excel file {profile.excel_file}: {e}")
+    
+    def fetch_recruiter_responses(self) -> List[Dict]:
+        """Fetch job-related emails (IMAP only, does not touch the job store)
+        
+        Mailboxes of several profiles are checked one after the other on
+        this thread, sharing the email parsing processes. Returns all
+        responses; each profile keeps its own in profile.responses.
+        """
+        for profile in self.profiles:
+            profile.responses = []
+        if self.offline:
+            self.logger.info("Offline run, not checking email")
+            return []
+        responses = []
+        for profile in self.profiles:
+            try:
+                profile.responses = profile.email_tracker.check_for_responses()
+            except Exception as e:
+                self.logger.error(f"Error fetching recruiter responses for profile {profile.name}: {e}")
+                profile.responses = []
+            responses += profile.responses
+        return responses
+    
+    def check_recruiter_responses(self, responses=None):
+        """Match recruiter responses (fetched now unless given) to each profile's applications"""
+        if responses is None:
+            self.fetch_recruiter_responses()
+        elif len(self.profiles) == 1:
+            self.profiles[0].responses = responses
+        for profile in self.profiles:
+            try:
+                response_count = (
+                    profile.email_tracker.match_responses_to_applications(profile.responses)
+                    if profile.responses else 0
+                )
+                self.logger.info(f"Checked recruiter responses for profile {profile.name}, found {response_count} new responses")
+            except Exception as e:
+                self.logger.error(f"Error checking recruiter responses for profile {profile.name}: {e}")
+    
+    async def _run_stage(self, name, func, *args):
+        """Run a blocking stage in the default executor and record its duration"""
+        loop = asyncio.get_running_loop()
+        if self.profiler:
+            func = self.profiler.wrap(func)
+        started = time.monotonic()
         try:
-            response_count = self.email_tracker.check_and_update_responses()
-            self.logger.info(f"Checked recruiter responses, found {response_count} new responses")
-        except Exception as e:
-            self.logger.error(f"Error checking recruiter responses: {e}")
+            return await loop.run_in_executor(None, func, *args)
+        finally:
+            self.stage_timings[name] = time.monotonic() - started
+            metrics.observe(f"stage_{name}", self.stage_timings[name])
+    
+    async def run_daily_stages(self) -> List[Dict]:
+        """Scrape portals and fetch email concurrently, then match responses
+        
+        Both network-bound stages run in executor threads. They join before
+        response matching, so responses are matched against the updated store.
+        """
+        self.stage_timings = {}
+        started = time.monotonic()
+        
+        # New jobs are stored in batches while the scrape runs
+        new_jobs, responses = await asyncio.gather(
+            self._run_stage('scrape', self.check_for_new_jobs),
+            self._run_stage('email_fetch', self.fetch_recruiter_responses)
+        )
+        
+        await self._run_stage('response_matching', self.check_recruiter_responses, responses)
+        
+        self.stage_timings['total'] = time.monotonic() - started
+        self.logger.info(self.format_stage_timings())
+        return new_jobs
     
-    def send_notification(self, message: str):
-        """Send email notification"""
+    def send_notification(self, message: str, profile: Profile = None):
+        """Send email notification (to the profile's address, by default the agent's)"""
+        if self.offline:
+            self.logger.info("Offline run, not sending the notification")
+            return
         try:
-            email_config = self.config['email_config']
+            email_config = (profile.config if profile else self.config)['email_config']
             
             if email_config['email'] == 'your_email@gmail.com':
                 self.logger.warning("Email not configured, skipping notification")
@@ -357,92 +995,285 @@ class JobTrackingAgent:
         except Exception as e:
             self.logger.error(f"Error sending notification: {e}")
     
-    def daily_job_check(self):
-        """Main function to run daily job check"""
-        self.logger.info("=" * 50)
-        self.logger.info("Starting daily job check...")
-        start_time = datetime.now()
-        
-        try:
-            # Check for new jobs
-            new_jobs = self.check_for_new_jobs()
-            
-            # Update Excel with new jobs
-            self.update_excel_with_new_jobs(new_jobs)
-            
-            # Check for recruiter responses
-            self.check_recruiter_responses()
-            
-            # Create summary message
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            
-            message = f"""Job Tracker Daily Summary
+    def format_scrape_stats(self) -> str:
+        """Summarize the last scraping pass for the daily summary"""
+        stats = self.last_scrape_stats
+        if not stats:
+            return "Scraping: not run"
+        shared = ""
+        if 'requested_searches' in stats:
+            shared = f"(shared by {len(self.profiles)} profiles asking for {stats['requested_searches']}) "
+        return (
+            f"Scraping: {stats['searches']} searches {shared}in {stats['wall_time']:.2f}s "
+            f"using {stats['workers']} browser sessions "
+            f"({stats['speedup']:.1f}x speedup over sequential), "
+            f"{stats['pages']} pages averaging {stats['avg_page_time']:.2f}s to load, "
+            f"{stats['stopped_on_known']} searches stopped early on already tracked jobs"
+        ) + self.format_cache_stats()
+    
+    def format_cache_stats(self) -> str:
+        """Summarize HTTP cache use during the last scraping pass"""
+        cache = self.last_scrape_stats.get('cache')
+        if not cache:
+            return ""
+        lookups = sum(cache.values())
+        return (
+            f"\nHTTP cache: {cache['fresh'] + cache['revalidated']} of {lookups} pages from cache "
+            f"({self.last_scrape_stats['cache_hit_rate']:.0%} hit rate, {cache['revalidated']} revalidated "
+            f"with a conditional GET, {cache['fetched']} downloaded, {cache['missing']} missing offline)"
+        )
+    
+    def format_stage_timings(self) -> str:
+        """Summarize how long each stage of the last run took"""
+        timings = self.stage_timings
+        if 'total' not in timings:
+            return "Stages: not run"
+        stages = ', '.join(
+            f"{name.replace('_', ' ')} {seconds:.2f}s"
+            for name, seconds in timings.items() if name != 'total'
+        )
+        sequential = sum(seconds for name, seconds in timings.items() if name != 'total')
+        return f"Stages: {stages} ({timings['total']:.2f}s wall-clock vs {sequential:.2f}s back to back)"
+    
+    def format_summary(self, profile: Profile, duration: float, new_jobs: List[Dict] = None) -> str:
+        """Daily summary message for one profile (of this run's new jobs unless given)"""
+        new_jobs = profile.new_jobs if new_jobs is None else new_jobs
+        message = f"""Job Tracker Daily Summary
             
 Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Duration: {duration:.2f} seconds
 New Jobs Found: {len(new_jobs)}
-Excel File: {self.excel_file}
+Excel File: {profile.excel_file}
+{self.format_scrape_stats()}
+{self.format_stage_timings()}
 
 Jobs by Portal:
 """
+        
+        portal_counts = {}
+        for job in new_jobs:
+            portal = job['Portal']
+            portal_counts[portal] = portal_counts.get(portal, 0) + 1
+        
+        for portal, count in portal_counts.items():
+            message += f"- {portal}: {count} jobs\n"
+        
+        if not new_jobs:
+            message += "No new jobs found today."
+        return message
+    
+    def daily_job_check(self):
+        """Main function to run daily job check"""
+        self.logger.info("=" * 50)
+        self.logger.info("Starting daily job check...")
+        start_time = datetime.now()
+        workbook_synced = False
+        
+        try:
+            # Pull hand edits (e.g. Status set to Applied) from the workbooks first
+            self.sync_excel()
+            workbook_synced = True
             
-            portal_counts = {}
-            for job in new_jobs:
-                portal = job['portal']
-                portal_counts[portal] = portal_counts.get(portal, 0) + 1
-            
-            for portal, count in portal_counts.items():
-                message += f"- {portal}: {count} jobs\n"
-            
-            if not new_jobs:
-                message += "No new jobs found today."
+            # Scrape and fetch email concurrently, then update the job stores
+            new_jobs = asyncio.run(self.run_daily_stages())
             
+            duration = (datetime.now() - start_time).total_seconds()
             self.logger.info(f"Daily job check completed. Found {len(new_jobs)} new jobs in {duration:.2f} seconds")
             
-            # Send notification
-            self.send_notification(message)
+            # Send notifications
+            for profile in self.profiles:
+                self.send_notification(self.format_summary(profile, duration), profile)
             
         except Exception as e:
             error_msg = f"Error in daily job check: {e}"
             self.logger.error(error_msg)
-            self.send_notification(error_msg)
+            for profile in self.profiles:
+                self.send_notification(error_msg, profile)
         
         finally:
+            # Never overwrite the workbooks if their edits could not be read back
+            if workbook_synced:
+                self.export_excel()
+            metrics.observe('daily_job_check', (datetime.now() - start_time).total_seconds())
+            self.write_metrics()
             self.logger.info("=" * 50)
     
+    def write_metrics(self):
+        """Write this run's metrics under logs/ and start counting the next run"""
+        metrics_config = self.config.get('metrics', {})
+        try:
+            if metrics_config.get('enabled', True):
+                timestamp = metrics.started_at.strftime('%Y%m%d_%H%M%S')
+                path = metrics.write_json(os.path.join(self.project_root, 'logs', f"metrics_{timestamp}.json"))
+                self.logger.info(f"Run metrics written to {path}")
+                
+                slowest = sorted(metrics.snapshot()['timers'].items(), key=lambda item: item[1]['total'], reverse=True)[:5]
+                self.logger.info("Most time spent in: " + ', '.join(
+                    f"{name} {timer['total']:.2f}s ({timer['count']}x)" for name, timer in slowest
+                ))
+            
+            if metrics_config.get('prometheus_file'):
+                path = metrics.write_prometheus(os.path.join(self.project_root, metrics_config['prometheus_file']))
+                self.logger.info(f"Prometheus metrics written to {path}")
+        except Exception as e:
+            self.logger.error(f"Error writing run metrics: {e}")
+        finally:
+            metrics.reset()
+    
+    def profile_run(self):
+        """Run the daily job check under cProfile and write the stats under logs/"""
+        self.profiler = ThreadProfiler()
+        try:
+            self.profiler.wrap(self.daily_job_check)()
+        finally:
+            profiler, self.profiler = self.profiler, None
+        
+        path = os.path.join(self.project_root, 'logs', f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+        stats = profiler.write(path)
+        self.logger.info(f"Profile of {len(profiler.profiles)} threads written to {path}")
+        stats.sort_stats('cumulative').print_stats(25)
+        return path
+    
+    def scrape_task(self):
+        """Scheduled scrape: store new listings and keep them for the next notification"""
+        self.sync_excel()
+        self.check_for_new_jobs()
+        for profile in self.profiles:
+            profile.jobs_since_notification += profile.new_jobs
+        self.export_excel()
+    
+    def email_task(self):
+        """Scheduled inbox check: fetch new mail and match it to applications"""
+        self.sync_excel()
+        self.check_recruiter_responses()
+        self.export_excel()
+    
+    def notify_task(self):
+        """Scheduled summary of the jobs found since the last one, then the period's metrics"""
+        for profile in self.profiles:
+            new_jobs, profile.jobs_since_notification = profile.jobs_since_notification, []
+            self.send_notification(self.format_summary(profile, self.last_scrape_stats.get('wall_time', 0.0), new_jobs), profile)
+        self.write_metrics()
+    
+    def scheduled_tasks(self) -> List[Task]:
+        """The tasks --schedule runs, from config['schedule']
+        
+        Each entry sets cron or interval_minutes, jitter_seconds and overlap
+        ("skip" or "coalesce"), or enabled: false. Configs without a schedule
+        scrape daily at schedule_time and notify an hour later. With
+        email_config.idle the IMAP IDLE listeners replace the email task.
+        """
+        hour, minute = (int(part) for part in self.config.get('schedule_time', '09:00').split(':'))
+        defaults = {
+            'scrape': {'cron': f"{minute} {hour} * * *", 'jitter_seconds': 0, 'overlap': 'skip'},
+            'email': {'interval_minutes': 10, 'jitter_seconds': 30, 'overlap': 'coalesce'},
+            'notify': {'cron': f"{minute} {(hour + 1) % 24} * * *", 'jitter_seconds': 0, 'overlap': 'skip'}
+        }
+        functions = {'scrape': self.scrape_task, 'email': self.email_task, 'notify': self.notify_task}
+        
+        if self.config['email_config'].get('idle', False):
+            del functions['email']
+        
+        tasks = []
+        for name, func in functions.items():
+            settings = self.config.get('schedule', {}).get(name, defaults[name])
+            if not settings.get('enabled', True):
+                continue
+            interval = settings.get('interval_minutes')
+            tasks.append(Task(
+                name,
+                func,
+                interval=interval * 60 if interval else None,
+                cron=None if interval else settings.get('cron', defaults[name].get('cron')),
+                jitter=settings.get('jitter_seconds', 0),
+                overlap=settings.get('overlap', 'skip')
+            ))
+        return tasks
+    
+    def update_workbooks(self, matched=0):
+        """Sync hand edits, then export the workbooks (after the IDLE listener recorded responses)"""
+        try:
+            self.sync_excel()
+        except Exception as e:
+            self.logger.error(f"Error syncing Excel files, not exporting: {e}")
+            return
+        self.export_excel()
+    
+    def start_listeners(self) -> List[Tuple[InboxListener, threading.Thread]]:
+        """Start an IMAP IDLE listener thread per profile with email configured, each holding one idle connection"""
+        listeners = []
+        for profile in self.profiles:
+            if not profile.email_tracker.is_configured():
+                self.logger.warning(f"Email not configured for profile {profile.name}, not listening for its mail")
+                continue
+            listener = InboxListener(profile.email_tracker, on_match=self.update_workbooks)
+            thread = threading.Thread(target=listener.run, name=f"idle-{profile.name}", daemon=True)
+            thread.start()
+            listeners.append((listener, thread))
+        self.logger.info(f"Started {len(listeners)} IMAP IDLE listeners")
+        return listeners
+    
+    def stop_listeners(self, listeners):
+        for listener, _ in listeners:
+            listener.stop()
+        for _, thread in listeners:
+            thread.join()
+    
+    def listen(self):
+        """Only match recruiter responses as they arrive (IMAP IDLE) until interrupted"""
+        listeners = self.start_listeners()
+        print("📬 Listening for recruiter responses. Press Ctrl+C to stop")
+        try:
+            while any(thread.is_alive() for _, thread in listeners):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.logger.info("Listeners stopped by user")
+            print("\n👋 Job Tracker Agent stopped")
+        finally:
+            self.stop_listeners(listeners)
+            self.cleanup()
+    
     def start_scheduler(self):
-        """Start the daily scheduler"""
-        schedule_time = self.config.get('schedule_time', '09:00')
-        schedule.every().day.at(schedule_time).do(self.daily_job_check)
+        """Run the scheduled tasks (and the IMAP IDLE listeners if enabled) until interrupted"""
+        listeners = self.start_listeners() if self.config['email_config'].get('idle', False) and not self.offline else []
+        scheduler = Scheduler()
+        tasks = self.scheduled_tasks()
+        for task in tasks:
+            scheduler.add(task)
         
-        self.logger.info(f"Job scheduler started. Will run daily at {schedule_time}")
-        print(f"🚀 Job Tracker Agent started! Will run daily at {schedule_time}")
+        self.logger.info(f"Job scheduler started with {len(tasks)} tasks")
+        print("🚀 Job Tracker Agent started! Tasks:")
+        for task in tasks:
+            print(f"  - {task.describe()}, next run at {scheduler.next_run_time(task)}")
         print("Press Ctrl+C to stop")
         
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+            scheduler.run()
         except KeyboardInterrupt:
+            scheduler.stop()
             self.logger.info("Scheduler stopped by user")
             print("\n👋 Job Tracker Agent stopped")
         finally:
+            self.stop_listeners(listeners)
             self.cleanup()
     
     def cleanup(self):
         """Cleanup resources"""
         try:
-            if hasattr(self, 'driver'):
-                self.driver.quit()
-                self.logger.info("WebDriver closed")
+            if hasattr(self, 'driver_pool'):
+                closed = self.driver_pool.close_all()
+                self.logger.info(f"Closed {closed} WebDriver sessions")
+            if hasattr(self, 'http_fetcher'):
+                self.http_fetcher.close()
+            for profile in getattr(self, 'profiles', []):
+                profile.close()
         except Exception as e:
             self.logger.error(f"Error during cleanup: {e}")
 
 def main():
     """Main entry point"""
     try:
-        agent = JobTrackingAgent()
+        agent = JobTrackingAgent(offline=sys.argv[1:2] == ['--offline'])
         
         # Check command line arguments
         if len(sys.argv) > 1:
@@ -452,10 +1283,35 @@ def main():
                 print("✅ Job check completed!")
             elif sys.argv[1] == '--schedule':
                 agent.start_scheduler()
+            elif sys.argv[1] == '--listen':
+                agent.listen()
+            elif sys.argv[1] == '--backfill':
+                print("🔍 Running a deep job check (all pages)...")
+                agent.backfill = True
+                agent.daily_job_check()
+                print("✅ Backfill completed!")
+            elif sys.argv[1] == '--profile':
+                print("🔍 Running job check once under the profiler...")
+                path = agent.profile_run()
+                print(f"✅ Profile written to {path} (open with: python -m pstats {path})")
+            elif sys.argv[1] == '--offline':
+                print("🔍 Replaying the job check from cached pages...")
+                agent.daily_job_check()
+                print("✅ Offline job check completed!")
+            elif sys.argv[1] == '--export':
+                agent.sync_excel()
+                agent.export_excel(force=True)
+                for profile in agent.profiles:
+                    print(f"✅ Exported tracker to {profile.excel_file}")
             else:
                 print("Usage:")
                 print("  python job_tracker.py --run-once   # Run once for testing")
-                print("  python job_tracker.py --schedule   # Start daily scheduler")
+                print("  python job_tracker.py --schedule   # Start the scheduler (scrape, email and notification tasks)")
+                print("  python job_tracker.py --listen     # Match recruiter responses as they arrive (IMAP IDLE)")
+                print("  python job_tracker.py --backfill   # Run once, paging deep without stopping on known jobs")
+                print("  python job_tracker.py --offline    # Run once from cached pages only (no network)")
+                print("  python job_tracker.py --profile    # Run once under cProfile, stats written to logs/")
+                print("  python job_tracker.py --export     # Write the Excel workbook from the job store")
         else:
             # Default behavior - run once
             print("🔍 Running job check once...")
@@ -0,0 +1,130 @@
+import re
+from typing import Dict, Iterable, Optional, Set
+
+# Keyword sets used to classify email; each can be overridden through the
+# "email_keywords" section of the config
+DEFAULT_EMAIL_KEYWORDS = {
+    'job': [
+        'application', 'position', 'role', 'interview', 'resume',
+        'cv', 'candidate', 'hiring', 'recruitment', 'job',
+        'opportunity', 'thank you for applying', 'your interest'
+    ],
+    'spam': ['unsubscribe', 'marketing', 'promotion', 'deal', 'sale'],
+    'automated_sender': ['noreply', 'no-reply', 'donotreply', 'automated'],
+    'auto_reply': [
+        'out of office', 'automatic reply', 'currently away',
+        'will respond', 'received your email'
+    ],
+    'rejection': [
+        'unfortunately', 'regret', 'not moving forward', 'not selected',
+        'decided to go', 'other candidates', 'not the right fit',
+        'will not be', 'have chosen', 'do not meet', 'unsuccessful'
+    ],
+    'interview': [
+        'interview', 'schedule', 'next step', 'phone call', 'meet',
+        'discussion', 'chat', 'available', 'calendar', 'zoom',
+        'teams meeting', 'would like to speak', 'set up a time'
+    ],
+    'interest': [
+        'interested', 'review your', 'impressive', 'experience',
+        'background', 'skills', 'qualified', 'would like to learn more',
+        'tell us more', 'additional information'
+    ]
+}
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex alternation factored into a trie, so each position is tried once per character"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # A keyword ends here; longer keywords continue (greedy, so longest wins)
+            body = f'(?:{body})?'
+        return body
+
+    return build(trie)
+
+
+# Below this many keywords, one C-level substring search per keyword beats a
+# regex pass (see `python src/benchmark.py classify`)
+SCAN_THRESHOLD = 150
+
+
+class KeywordMatcher:
+    """Find every keyword of several categories with one pass over the text
+
+    Matching is case-insensitive substring matching, like `keyword in text`,
+    and reports each distinct keyword once. Large keyword sets are compiled
+    into a single trie-shaped regex whose cost grows with the length of the
+    text, not with the number of keywords; small sets are checked with plain
+    substring searches, which CPython runs faster than any regex.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], scan_threshold=SCAN_THRESHOLD):
+        self.categories = {}
+        for name, keywords in categories.items():
+            self.categories[name] = {keyword.lower() for keyword in keywords if keyword}
+
+        self.keyword_categories = {}
+        for name, keywords in self.categories.items():
+            for keyword in keywords:
+                self.keyword_categories.setdefault(keyword, set()).add(name)
+
+        keywords = list(self.keyword_categories)
+        self.keywords = keywords
+        self.use_regex = len(keywords) > scan_threshold
+
+        # Keywords contained in a longer keyword are present whenever it is
+        self.implied = {
+            keyword: {other for other in keywords if other in keyword}
+            for keyword in keywords
+        }
+
+        # The lookahead reports the longest keyword starting at every position
+        # without consuming it, so overlapping keywords are all seen
+        trie = _trie_pattern(keywords) if keywords else '(?!)'
+        self.pattern = re.compile(f'(?=({trie}))')
+
+    def find(self, text: str) -> Set[str]:
+        """Distinct keywords occurring in the text"""
+        text = text.lower()
+        if not self.use_regex:
+            return {keyword for keyword in self.keywords if keyword in text}
+
+        found = set()
+        for match in self.pattern.finditer(text):
+            keyword = match.group(1)
+            if keyword not in found:
+                found |= self.implied[keyword]
+        return found
+
+    def first_category(self, text: str, order: Iterable[str]) -> Optional[str]:
+        """First category in order with any keyword in the text, or None"""
+        if not self.use_regex:
+            # Substring searches can stop at the first hit
+            text = text.lower()
+            for name in order:
+                if any(keyword in text for keyword in self.categories[name]):
+                    return name
+            return None
+
+        counts = self.counts(text)
+        return next((name for name in order if counts[name]), None)
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords per category occurring in the text"""
+        counts = dict.fromkeys(self.categories, 0)
+        for keyword in self.find(text):
+            for name in self.keyword_categories[keyword]:
+                counts[name] += 1
+        return counts
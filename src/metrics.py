@@ -0,0 +1,208 @@
+"""
+Lightweight run metrics: named timers and counters, exported per run as JSON
+and optionally in the Prometheus text format, plus a multi-thread profiler.
+"""
+
+import cProfile
+import functools
+import json
+import math
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict
+
+
+# Durations kept per timer for percentiles; beyond this a uniform sample is kept
+MAX_SAMPLES = 10000
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class RunMetrics:
+    """Thread-safe timers and counters for one run of the agent"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far and start a new run"""
+        with self._lock:
+            self.started_at = datetime.now()
+            self.timers = {}
+            self.samples = {}
+            self.counters = {}
+
+    def observe(self, name, seconds):
+        """Record one duration for a timer"""
+        with self._lock:
+            timer = self.timers.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            timer['count'] += 1
+            timer['total'] += seconds
+            timer['max'] = max(timer['max'], seconds)
+
+            # Reservoir sampling keeps memory bounded on long runs
+            samples = self.samples.setdefault(name, [])
+            if len(samples) < MAX_SAMPLES:
+                samples.append(seconds)
+            else:
+                slot = self._random.randrange(timer['count'])
+                if slot < MAX_SAMPLES:
+                    samples[slot] = seconds
+
+    def count(self, name, value=1):
+        """Add to a counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def drain(self) -> Dict:
+        """Durations and counters recorded so far, then reset (to ship them to another process)"""
+        with self._lock:
+            recorded = {'samples': self.samples, 'counters': self.counters}
+        self.reset()
+        return recorded
+
+    def merge(self, recorded):
+        """Add what another process drained, e.g. a worker of a process pool"""
+        for name, samples in recorded['samples'].items():
+            for seconds in samples:
+                self.observe(name, seconds)
+        for name, value in recorded['counters'].items():
+            self.count(name, value)
+
+    @contextmanager
+    def timer(self, name):
+        """Time the enclosed block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def timed(self, name):
+        """Decorator timing every call of a function"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _timer_summary(self, name, timer) -> Dict:
+        samples = sorted(self.samples.get(name, []))
+        return dict(
+            timer,
+            mean=timer['total'] / timer['count'],
+            p50=percentile(samples, 0.50),
+            p95=percentile(samples, 0.95),
+            p99=percentile(samples, 0.99)
+        )
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'duration': (datetime.now() - self.started_at).total_seconds(),
+                'timers': {
+                    name: self._timer_summary(name, timer)
+                    for name, timer in sorted(self.timers.items())
+                },
+                'counters': dict(sorted(self.counters.items()))
+            }
+
+    def write_json(self, path) -> str:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+    def write_prometheus(self, path, prefix='job_tracker') -> str:
+        """Write the metrics in the Prometheus text exposition format (for the node exporter textfile collector)"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_duration_seconds Time spent per instrumented operation",
+            f"# TYPE {prefix}_duration_seconds summary"
+        ]
+        for name, timer in snapshot['timers'].items():
+            for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99')):
+                lines.append(f'{prefix}_duration_seconds{{operation="{name}",quantile="{quantile}"}} {timer[key]:.6f}')
+            lines.append(f'{prefix}_duration_seconds_sum{{operation="{name}"}} {timer["total"]:.6f}')
+            lines.append(f'{prefix}_duration_seconds_count{{operation="{name}"}} {timer["count"]}')
+        lines += [
+            f"# HELP {prefix}_operation_max_seconds Slowest single call per instrumented operation",
+            f"# TYPE {prefix}_operation_max_seconds gauge"
+        ]
+        for name, timer in snapshot['timers'].items():
+            lines.append(f'{prefix}_operation_max_seconds{{operation="{name}"}} {timer["max"]:.6f}')
+        lines += [
+            f"# HELP {prefix}_events_total Events counted during the run",
+            f"# TYPE {prefix}_events_total counter"
+        ]
+        for name, value in snapshot['counters'].items():
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        lines += [
+            f"# HELP {prefix}_run_duration_seconds Wall-clock duration of the run",
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {snapshot['duration']:.3f}"
+        ]
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Write then rename, so a scraper never reads a half-written file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+        return path
+
+
+
+class ThreadProfiler:
+    """cProfile across threads
+
+    cProfile only sees the thread that enabled it, so work handed to executor
+    threads is wrapped to profile itself; all profiles are merged on write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.profiles = []
+
+    def wrap(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    self.profiles.append(profile)
+        return wrapper
+
+    def write(self, path) -> pstats.Stats:
+        """Merge the collected profiles, dump them to path and return the stats"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._lock:
+            stats = pstats.Stats(self.profiles[0])
+            for profile in self.profiles[1:]:
+                stats.add(profile)
+        stats.dump_stats(path)
+        return stats
+
+
+# Shared by every module of a run, like the logging registry
+metrics = RunMetrics()
@@ -0,0 +1,77 @@
+"""
+Profiles: several people's searches, mailboxes and workbooks served by one
+agent, which shares its browser pool, HTTP cache and email parsing processes.
+"""
+
+import copy
+import logging
+import os
+from typing import Dict, List
+
+from src.email_tracker import EmailResponseTracker
+from src.job_store import JobStore
+
+
+def merge_config(base: Dict, overrides: Dict) -> Dict:
+    """Copy of base with overrides applied, nested dicts merged key by key"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+class Profile:
+    """One person's searches, mailbox, workbook and job store"""
+
+    def __init__(self, name, config, project_root, parse_pool_owner=None):
+        self.name = name
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        # Relative data_dir values are resolved against the project root
+        self.data_dir = os.path.join(project_root, config.get('data_dir', 'data'))
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.excel_file = os.path.join(self.data_dir, config.get('excel_file', 'job_applications.xlsx'))
+
+        # The SQLite store is the working copy; the workbook is imported into it once
+        self.store = JobStore(os.path.join(self.data_dir, config.get('database_file', 'job_tracker.db')))
+        self.store.import_excel(self.excel_file)
+        self.email_tracker = EmailResponseTracker(config, self.store, parse_pool_owner)
+
+        # Results of the current run
+        self.new_jobs = []
+        self.responses = []
+
+        # Jobs scheduled scrapes found since the last scheduled notification
+        self.jobs_since_notification = []
+
+    def close(self):
+        self.email_tracker.close()
+        self.store.close()
+
+
+def load_profiles(config, project_root) -> List[Profile]:
+    """The profiles listed under config['profiles'], or the config itself as the only profile
+
+    Each listed profile needs a name and overrides any part of the config
+    (search_parameters, email_config, excel_file, ...); its data lives in
+    <data_dir>/profiles/<name> unless it sets its own data_dir. All profiles
+    share the parse processes of the first one, each classifying its email
+    with its own settings.
+    """
+    entries = config.get('profiles') or []
+    if not entries:
+        return [Profile('default', config, project_root)]
+
+    base = {key: value for key, value in config.items() if key != 'profiles'}
+    profiles = []
+    for entry in entries:
+        name = entry['name']
+        overrides = {key: value for key, value in entry.items() if key != 'name'}
+        overrides.setdefault('data_dir', os.path.join(config.get('data_dir', 'data'), 'profiles', name))
+        owner = profiles[0].email_tracker if profiles else None
+        profiles.append(Profile(name, merge_config(base, overrides), project_root, owner))
+    return profiles
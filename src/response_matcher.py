@@ -0,0 +1,179 @@
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from src.job_store import normalize_text
+
+# Minimum score for a response to be attributed to an application
+MIN_MATCH_SCORE = 3
+
+
+def response_tokens(response: Dict) -> Set[str]:
+    """Tokens of a response looked up in the application token index
+
+    Words of the extracted company (also joined up) and the subject, plus the
+    labels of the sender's domain, each also without hyphens ("jobs@acme-robotics.co.uk"
+    -> acme, robotics, acmerobotics, co, uk).
+    """
+    company = normalize_text(response['company'])
+    tokens = set(company.split())
+    tokens.add(company.replace(' ', ''))
+    tokens.update(normalize_text(response['subject']).split())
+    if '@' in response['sender']:
+        domain = response['sender'].split('@')[1].lower()
+        for label in re.split(r'[^0-9a-z-]+', domain):
+            tokens.update(part for part in label.split('-') if part)
+            tokens.add(label.replace('-', ''))
+    tokens.discard('')
+    return tokens
+
+
+def _recency_bonus(date_applied, now) -> int:
+    """2 points if applied within a week, 1 within two weeks"""
+    try:
+        days_since_applied = (now - pd.to_datetime(date_applied)).days
+    except Exception:
+        return 0
+    if days_since_applied <= 7:
+        return 2
+    if days_since_applied <= 14:
+        return 1
+    return 0
+
+
+class ApplicationMatcher:
+    """Score email responses against applied jobs in bulk
+
+    Job features (lower-cased and domain-cleaned company names, title words,
+    recency bonus) are computed once per set of applied jobs; scoring a batch
+    of responses is then a handful of array operations producing a
+    responses x jobs score matrix:
+
+      +5  job company and extracted company contain one another
+      +3  domain-cleaned company appears in the sender's domain
+      +1  per title word longer than 3 characters found in the subject
+      +2/+1  applied within the last 7/14 days
+    """
+
+    def __init__(self, applied_jobs: pd.DataFrame, now=None):
+        now = now or datetime.now()
+        self.job_ids = applied_jobs.index.to_numpy()
+
+        companies = [str(company).lower() for company in applied_jobs['Company']]
+        self.companies = np.array(companies, dtype=str)
+        self.companies_clean = np.array(
+            [company.replace(' ', '').replace('-', '') for company in companies], dtype=str
+        )
+
+        # Title words as a jobs x vocabulary count matrix (repeated words count twice)
+        vocabulary = {}
+        postings = []
+        for row, title in enumerate(applied_jobs['Title']):
+            for word in str(title).lower().split():
+                if len(word) > 3:
+                    postings.append((row, vocabulary.setdefault(word, len(vocabulary))))
+        self.title_vocabulary = np.array(list(vocabulary), dtype=str)
+        self.title_words = np.zeros((len(companies), len(vocabulary)), dtype=np.int32)
+        for row, column in postings:
+            self.title_words[row, column] += 1
+
+        # The same words in job order, for scoring single pairs: the words of job
+        # row i are word_columns[word_starts[i]:word_starts[i + 1]]
+        self.word_columns = np.array([column for _, column in postings], dtype=np.int64)
+        words_per_job = np.bincount([row for row, _ in postings], minlength=len(companies))
+        self.word_starts = np.concatenate(([0], np.cumsum(words_per_job))).astype(np.int64)
+
+        # Few distinct dates, so parse each once
+        bonus_by_date = {}
+        for date in applied_jobs['Date_Applied']:
+            if date not in bonus_by_date:
+                bonus_by_date[date] = _recency_bonus(date, now) if pd.notna(date) else 0
+        self.recency = np.array([bonus_by_date[date] for date in applied_jobs['Date_Applied']], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def _response_features(self, responses: List[Dict]):
+        companies = np.array([response['company'].lower() for response in responses], dtype=str)
+        subjects = np.array([response['subject'].lower() for response in responses], dtype=str)
+        domains = np.array([
+            response['sender'].split('@')[1].lower().replace('-', '').replace('.', '')
+            if '@' in response['sender'] else ''
+            for response in responses
+        ], dtype=str)
+        has_domain = np.array(['@' in response['sender'] for response in responses])
+        return companies, subjects, domains, has_domain
+
+    def score(self, responses: List[Dict]) -> np.ndarray:
+        """Score matrix of shape (len(responses), len(jobs))"""
+        if not responses or not len(self):
+            return np.zeros((len(responses), len(self)), dtype=np.int32)
+
+        companies, subjects, domains, has_domain = (
+            feature[:, None] for feature in self._response_features(responses)
+        )
+        company_match = (np.char.find(companies, self.companies) >= 0) | (np.char.find(self.companies, companies) >= 0)
+        domain_match = has_domain & (np.char.find(domains, self.companies_clean) >= 0)
+
+        scores = 5 * company_match + 3 * domain_match + self.recency
+        if len(self.title_vocabulary):
+            words_in_subject = (np.char.find(subjects, self.title_vocabulary) >= 0).astype(np.int32)
+            scores = scores + words_in_subject @ self.title_words.T
+        return scores.astype(np.int32)
+
+    def score_pairs(self, responses: List[Dict], response_rows: np.ndarray, job_rows: np.ndarray) -> np.ndarray:
+        """Scores of the given (response row, job row) pairs only, same rules as score()"""
+        companies, subjects, domains, has_domain = self._response_features(responses)
+        companies, subjects, domains, has_domain = (
+            companies[response_rows], subjects[response_rows], domains[response_rows], has_domain[response_rows]
+        )
+        job_companies = self.companies[job_rows]
+
+        company_match = (np.char.find(companies, job_companies) >= 0) | (np.char.find(job_companies, companies) >= 0)
+        domain_match = has_domain & (np.char.find(domains, self.companies_clean[job_rows]) >= 0)
+        scores = 5 * company_match + 3 * domain_match + self.recency[job_rows]
+
+        if len(self.word_columns):
+            # Expand each pair into one entry per title word of its job
+            starts = self.word_starts[job_rows]
+            counts = self.word_starts[job_rows + 1] - starts
+            pair_of_word = np.repeat(np.arange(len(job_rows)), counts)
+            positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+            words = self.title_vocabulary[self.word_columns[positions]]
+            hits = np.char.find(subjects[pair_of_word], words) >= 0
+            scores = scores + np.bincount(pair_of_word, weights=hits, minlength=len(job_rows)).astype(np.int32)
+        return scores.astype(np.int32)
+
+    def best_matches(self, responses: List[Dict], candidates: Optional[List[Set[int]]] = None) -> List:
+        """Job id with the highest score for each response (first on ties), or None below MIN_MATCH_SCORE
+
+        With candidates, each response is only scored against the job ids in
+        its own candidate set instead of against every job.
+        """
+        if not len(self):
+            return [None] * len(responses)
+        if candidates is None:
+            scores = self.score(responses)
+            best = scores.argmax(axis=1)
+            return [
+                int(self.job_ids[column]) if scores[row, column] >= MIN_MATCH_SCORE else None
+                for row, column in enumerate(best)
+            ]
+
+        job_rows = {job_id: row for row, job_id in enumerate(self.job_ids.tolist())}
+        pairs = [(response, job_rows[job_id]) for response, ids in enumerate(candidates) for job_id in sorted(ids) if job_id in job_rows]
+        matches = [None] * len(responses)
+        if not pairs:
+            return matches
+        response_rows, pair_jobs = (np.array(column, dtype=np.int64) for column in zip(*pairs))
+        scores = self.score_pairs(responses, response_rows, pair_jobs)
+
+        best_scores = [MIN_MATCH_SCORE - 1] * len(responses)
+        for response, job, score in zip(response_rows.tolist(), pair_jobs.tolist(), scores.tolist()):
+            if score > best_scores[response]:
+                best_scores[response] = score
+                matches[response] = int(self.job_ids[job])
+        return matches
@@ -0,0 +1,239 @@
+"""
+Event-driven scheduler: tasks with their own interval or cron expression and
+jitter run on worker threads, and the loop sleeps until the next one is due.
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Set
+
+from src.metrics import metrics
+
+
+class CronExpression:
+    """Five-field cron expression: minute hour day-of-month month day-of-week
+
+    Fields take *, numbers, ranges (1-5), lists (1,15) and steps (*/10,
+    8-18/2). Day of week runs from 0 (Sunday) to 6, 7 is Sunday too. As in
+    cron, when both day fields are restricted a day matching either runs.
+    """
+
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for part in field.split(','):
+            spec, _, step = part.partition('/')
+            if spec == '*':
+                start, end = low, high
+            elif '-' in spec:
+                start, end = (int(value) for value in spec.split('-', 1))
+            else:
+                start = end = int(spec)
+                if step:
+                    end = high
+            if not low <= start <= end <= high:
+                raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_month = moment.day in self.days
+        in_week = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Skips whole months, days and hours that cannot match; five years covers every valid expression
+        limit = candidate + timedelta(days=5 * 366)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+class Task:
+    """A recurring job for the Scheduler
+
+    Runs every `interval` seconds or at the times of a `cron` expression,
+    each run delayed by a random 0-`jitter` seconds. overlap says what
+    happens when a run falls due while the previous one is still going:
+    "skip" drops it, "coalesce" runs once more as soon as that run ends
+    (however many runs were missed meanwhile).
+    """
+
+    def __init__(self, name: str, func: Callable, interval: float = None, cron: str = None,
+                 jitter: float = 0.0, overlap: str = 'skip', run_at_start: bool = False):
+        if (interval is None) == (cron is None):
+            raise ValueError(f"Task {name} needs either an interval or a cron expression")
+        if overlap not in ('skip', 'coalesce'):
+            raise ValueError(f"Task {name}: overlap must be 'skip' or 'coalesce', not {overlap!r}")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = CronExpression(cron) if cron else None
+        self.jitter = jitter
+        self.overlap = overlap
+        self.run_at_start = run_at_start
+
+        self.running = False
+        self.pending = False
+        self.runs = 0
+        self.skipped = 0
+
+    def next_time(self, after: float) -> float:
+        """Scheduled (un-jittered) wall-clock time of the next run after `after` (a time.time() value)"""
+        if self.cron:
+            return self.cron.next_after(datetime.fromtimestamp(after)).timestamp()
+        return after + self.interval
+
+    def jittered(self, scheduled: float) -> float:
+        """When a run scheduled for `scheduled` actually starts, with fresh jitter"""
+        return scheduled + random.uniform(0, self.jitter) if self.jitter else scheduled
+
+    def describe(self) -> str:
+        schedule = f"cron '{self.cron.expression}'" if self.cron else f"every {self.interval:g}s"
+        return f"{self.name} ({schedule}, jitter {self.jitter:g}s, {self.overlap} overlapping runs)"
+
+
+class Scheduler:
+    """Runs Tasks on worker threads, sleeping until the next one is due
+
+    Due times are kept in a heap, so the loop wakes up only when a task is
+    due or when tasks are added or the scheduler is stopped. Each task has
+    its own worker thread slot: a long scrape never delays an inbox check.
+    Heap entries keep the un-jittered time they were scheduled for, and the
+    next run is computed from that, so jitter never accumulates.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.tasks: List[Task] = []
+        self._heap = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._executor = None
+
+    def add(self, task: Task):
+        now = time.time()
+        with self._cond:
+            self.tasks.append(task)
+            scheduled = now if task.run_at_start else task.next_time(now)
+            self._push(scheduled if task.run_at_start else task.jittered(scheduled), task, scheduled)
+            self._cond.notify()
+        self.logger.info(f"Scheduled {task.describe()}, next run at {self.next_run_time(task)}")
+
+    def _push(self, due: float, task: Task, scheduled: Optional[float]):
+        """Queue a run of task; scheduled is None for a one-off (coalesced) run that is not rescheduled"""
+        heapq.heappush(self._heap, (due, next(self._order), task, scheduled))
+
+    def next_run_time(self, task: Task) -> Optional[str]:
+        with self._cond:
+            due = min((due for due, _, queued, _ in self._heap if queued is task), default=None)
+        return datetime.fromtimestamp(due).strftime('%Y-%m-%d %H:%M:%S') if due else None
+
+    def run(self):
+        """Dispatch due tasks until stop() is called (blocks the calling thread)"""
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.tasks)), thread_name_prefix='task')
+        interrupted = False
+        try:
+            with self._cond:
+                while not self._stopped:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due, _, task, scheduled = self._heap[0]
+                    now = time.time()
+                    if due > now:
+                        # Woken early by add() or stop(); re-check the heap either way
+                        self._cond.wait(due - now)
+                        continue
+                    heapq.heappop(self._heap)
+                    if scheduled is not None:
+                        following = task.next_time(scheduled)
+                        if following <= now:
+                            # Fell behind (e.g. the machine slept): resume from now instead of catching up
+                            following = task.next_time(now)
+                        self._push(task.jittered(following), task, following)
+                    self._dispatch(task)
+        except BaseException:
+            # Ctrl+C: do not hold the process until a long scrape finishes
+            interrupted = True
+            raise
+        finally:
+            with self._cond:
+                self._stopped = True
+                running = [task.name for task in self.tasks if task.running]
+            if interrupted and running:
+                self.logger.warning(f"Not waiting for running tasks: {', '.join(running)}")
+            self._executor.shutdown(wait=not interrupted, cancel_futures=True)
+
+    def _dispatch(self, task: Task):
+        """Start a due task, or skip/coalesce it while its previous run is going (lock held)"""
+        if task.running:
+            if task.overlap == 'coalesce':
+                task.pending = True
+                self.logger.info(f"Task {task.name} is still running, will run again when it finishes")
+            else:
+                task.skipped += 1
+                metrics.count(f"task_{task.name}_skipped")
+                self.logger.info(f"Task {task.name} is still running, skipping this run")
+            return
+        task.running = True
+        self._executor.submit(self._run_task, task)
+
+    def _run_task(self, task: Task):
+        started = time.monotonic()
+        self.logger.info(f"Running task {task.name}")
+        try:
+            task.func()
+        except Exception as e:
+            self.logger.error(f"Task {task.name} failed: {e}")
+        finally:
+            elapsed = time.monotonic() - started
+            metrics.observe(f"task_{task.name}", elapsed)
+            with self._cond:
+                task.runs += 1
+                task.running = False
+                if task.pending and not self._stopped:
+                    task.pending = False
+                    self._push(time.time(), task, None)
+                    self._cond.notify()
+            self.logger.info(f"Task {task.name} finished in {elapsed:.2f}s")
+
+    def stop(self):
+        """Stop dispatching; run() returns once the running tasks finish"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()